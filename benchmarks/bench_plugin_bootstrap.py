@@ -0,0 +1,340 @@
+"""
+Golden-output regression checks and benchmarks for plugin_bootstrap.BukkitPluginGenerator.
+
+Usage:
+
+    python3 benchmarks/bench_plugin_bootstrap.py check             # compares the rendered files to the golden outputs
+    python3 benchmarks/bench_plugin_bootstrap.py update-golden     # rewrites the golden outputs (after a wanted change)
+    python3 benchmarks/bench_plugin_bootstrap.py bench [--sizes tiny,small] [--save-baseline]
+
+Small cases are stored as snapshots (every file, byte for byte). Large cases, with thousands of files, are stored as
+SHA-256 digests: of all the files, and of each family of files whose paths only differ by numbers (like the commands
+classes), with the digests of the different contents of the family once numbers are masked. When a large case does
+not match, the files that changed are named, from their masked contents.
+
+Benchmarks time separately the validation, the rendering (in memory) and the commit (writing files into a temporary
+folder) of synthetic models, and measure the peak memory used by the rendering. Results are compared to the stored
+baseline, which was recorded on a given machine: compare relative changes, and record a new baseline on yours first.
+"""
+import argparse
+import hashlib
+import json
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from plugin_bootstrap import BukkitPluginGenerator  # noqa: E402
+
+
+BENCHMARKS_FOLDER = Path(__file__).resolve().parent
+GOLDEN_FOLDER = BENCHMARKS_FOLDER / 'golden'
+BASELINE_FILE = BENCHMARKS_FOLDER / 'baseline.json'
+
+# Slower or bigger than the baseline by this factor is reported as a regression
+REGRESSION_THRESHOLD = 1.5
+
+# Differing files listed per family of a large case, the others are only counted
+LISTED_DIFFERENCES = 10
+
+SIZES = {
+    'tiny': {'commands': 1, 'sub_commands': 2, 'listeners': 1, 'plain_commands': 1},
+    'small': {'commands': 10, 'sub_commands': 3, 'listeners': 10},
+    'medium': {'commands': 1000, 'sub_commands': 3, 'listeners': 100},
+    'large': {'commands': 10000, 'sub_commands': 3, 'listeners': 1000},
+}
+
+ALL_OPTIONS = {'task_scheduler': True, 'persistence': True, 'instrumentation': True}
+
+# name -> (size, zLib, generator options, snapshot or digest)
+GOLDEN_CASES = {
+    'tiny-zlib': ('tiny', True, {}, 'snapshot'),
+    'tiny-bukkit': ('tiny', False, {}, 'snapshot'),
+    'full-zlib-maven': ('tiny', True, dict(ALL_OPTIONS, fast_dev_build=True), 'snapshot'),
+    'full-bukkit-maven': ('tiny', False, dict(ALL_OPTIONS, fast_dev_build=True), 'snapshot'),
+    'full-zlib-gradle': ('tiny', True, dict(ALL_OPTIONS, build_system='gradle'), 'snapshot'),
+    'full-bukkit-gradle': ('tiny', False, dict(ALL_OPTIONS, build_system='gradle'), 'snapshot'),
+    'large-zlib': ('large', True, {}, 'digest'),
+    'large-bukkit': ('large', False, {}, 'digest'),
+}
+
+
+def create_generator(folder: Path, size: str, zlib: bool, **options):
+    counts = SIZES[size]
+
+    generator = BukkitPluginGenerator(
+            folder=folder, name='Bench Plugin', package='fr.zcraft.bench', main_class='BenchPlugin', version='1.0',
+            author='zDevelopers', website='https://github.com/zDevelopers', description='Synthetic plugin',
+            zlib=zlib, **options
+    )
+
+    for i in range(counts['listeners']):
+        generator.add_listener('Listener{0}'.format(i))
+
+    for i in range(counts['commands']):
+        generator.add_command({
+            'name': 'command{0}'.format(i),
+            'description': 'Command number {0}'.format(i),
+            'sub_commands': ['sub{0}'.format(j) for j in range(counts['sub_commands'])]
+        })
+
+    # Commands without sub-commands, generated differently in Bukkit mode
+    for i in range(counts.get('plain_commands', 0)):
+        generator.add_command({
+            'name': 'plain{0}'.format(i),
+            'description': 'Plain command number {0}'.format(i),
+            'sub_commands': []
+        })
+
+    return generator
+
+
+def render_case(name: str):
+    size, zlib, options, _ = GOLDEN_CASES[name]
+    folder = Path('plugin')
+
+    generator = create_generator(folder, size, zlib, **options)
+    generator.validate()
+
+    files = {}
+    for generated_file in generator.render():
+        files[generated_file.path.relative_to(folder).as_posix()] = generated_file.content.encode('utf-8')
+
+    return files
+
+
+def snapshot(files: dict):
+    """Serializes files in a readable format, each one preceded by its path and size in bytes."""
+    data = b''
+    for path in sorted(files):
+        data += '===== {0} ({1} bytes) =====\n'.format(path, len(files[path])).encode('utf-8') + files[path] + b'\n'
+
+    return data
+
+
+def parse_snapshot(data: bytes):
+    files = {}
+    position = 0
+
+    while position < len(data):
+        header_end = data.index(b'\n', position)
+        header = data[position:header_end].decode('utf-8')
+
+        path, size = header[len('===== '):-len(' bytes) =====')].rsplit(' (', 1)
+        content_start = header_end + 1
+        files[path] = data[content_start:content_start + int(size)]
+
+        position = content_start + int(size) + 1
+
+    return files
+
+
+def sha256(files: dict, paths):
+    sha = hashlib.sha256()
+    for path in paths:
+        sha.update(path.encode('utf-8') + b'\0' + files[path] + b'\0')
+
+    return sha.hexdigest()
+
+
+def family(path: str):
+    return re.sub('[0-9]+', '#', path)
+
+
+def masked_digest(content: bytes):
+    return hashlib.sha256(re.sub(b'[0-9]+', b'#', content)).hexdigest()[:16]
+
+
+def families(files: dict):
+    """Groups the paths by family (paths only differing by numbers)."""
+    grouped = {}
+    for path in sorted(files):
+        grouped.setdefault(family(path), []).append(path)
+
+    return grouped
+
+
+def digest(files: dict):
+    return {
+        'files': len(files),
+        'sha256': sha256(files, sorted(files)),
+        'families': {name: {
+            'files': len(paths),
+            'sha256': sha256(files, paths),
+            'masked_contents': sorted(set(masked_digest(files[path]) for path in paths))
+        } for name, paths in families(files).items()}
+    }
+
+
+def digest_problems(files: dict, expected: dict):
+    if digest(files)['sha256'] == expected['sha256']:
+        return []
+
+    problems = []
+    actual_families = families(files)
+
+    for name in sorted(set(expected['families']) | set(actual_families)):
+        paths = actual_families.get(name, [])
+        expected_family = expected['families'].get(name)
+
+        if expected_family is None:
+            problems.append('{0} unexpected files {1}'.format(len(paths), name))
+            continue
+        elif not paths:
+            problems.append('{0} missing files {1}'.format(expected_family['files'], name))
+            continue
+        elif sha256(files, paths) == expected_family['sha256']:
+            continue
+
+        if len(paths) != expected_family['files']:
+            problems.append('{0} files {1}, expected {2}'.format(len(paths), name, expected_family['files']))
+
+        different = [path for path in paths if masked_digest(files[path]) not in expected_family['masked_contents']]
+        problems += ['different file ' + path for path in different[:LISTED_DIFFERENCES]]
+
+        if len(different) > LISTED_DIFFERENCES:
+            problems.append('... and {0} other different files {1}'.format(len(different) - LISTED_DIFFERENCES, name))
+        elif not different and len(paths) == expected_family['files']:
+            problems.append('different files {0} (only numbers changed, or files renamed)'.format(name))
+
+    return problems
+
+
+def check():
+    failures = 0
+
+    for name, (_, _, _, kind) in GOLDEN_CASES.items():
+        files = render_case(name)
+
+        if kind == 'snapshot':
+            expected = parse_snapshot((GOLDEN_FOLDER / (name + '.txt')).read_bytes())
+            problems = ['missing file ' + path for path in sorted(set(expected) - set(files))] \
+                + ['unexpected file ' + path for path in sorted(set(files) - set(expected))] \
+                + ['different file ' + path for path in sorted(set(files) & set(expected))
+                   if files[path] != expected[path]]
+        else:
+            problems = digest_problems(files, json.loads((GOLDEN_FOLDER / (name + '.json')).read_text()))
+
+        print('{0}: {1}'.format(name, 'FAIL' if problems else 'ok'))
+        for problem in problems:
+            print('    ' + problem)
+
+        failures += bool(problems)
+
+    return 1 if failures else 0
+
+
+def update_golden():
+    GOLDEN_FOLDER.mkdir(exist_ok=True)
+
+    for name, (_, _, _, kind) in GOLDEN_CASES.items():
+        files = render_case(name)
+
+        if kind == 'snapshot':
+            (GOLDEN_FOLDER / (name + '.txt')).write_bytes(snapshot(files))
+        else:
+            (GOLDEN_FOLDER / (name + '.json')).write_text(json.dumps(digest(files), indent=4, sort_keys=True) + '\n')
+
+        print('{0}: {1} files'.format(name, len(files)))
+
+    return 0
+
+
+def bench_one(size: str, zlib: bool):
+    work_folder = Path(tempfile.mkdtemp(prefix='bench_plugin_bootstrap_'))
+
+    try:
+        generator = create_generator(work_folder / 'plugin', size, zlib)
+
+        start = time.perf_counter()
+        generator.validate()
+        validate_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        files = generator.render()
+        render_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        generator.commit(files)
+        commit_time = time.perf_counter() - start
+
+        files_count = len(files)
+
+        # Measured apart, as tracing allocations slows everything down
+        del files
+        tracemalloc.start()
+        generator.render()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    finally:
+        shutil.rmtree(str(work_folder), ignore_errors=True)
+
+    return {
+        'files': files_count,
+        'validate_seconds': round(validate_time, 6),
+        'render_seconds': round(render_time, 6),
+        'commit_seconds': round(commit_time, 6),
+        'render_files_per_second': round(files_count / render_time) if render_time else None,
+        'commit_files_per_second': round(files_count / commit_time) if commit_time else None,
+        'render_peak_memory_bytes': peak_memory
+    }
+
+
+def bench(sizes: list, save_baseline: bool):
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    results = {}
+    regressions = 0
+
+    for size in sizes:
+        for zlib in (True, False):
+            name = '{0}-{1}'.format(size, 'zlib' if zlib else 'bukkit')
+            result = results[name] = bench_one(size, zlib)
+
+            print('{0}: {1} files, validate {2:.3f} s, render {3:.3f} s ({4} files/s), commit {5:.3f} s '
+                  '({6} files/s), render peak memory {7:.1f} MiB'.format(
+                        name, result['files'], result['validate_seconds'], result['render_seconds'],
+                        result['render_files_per_second'], result['commit_seconds'],
+                        result['commit_files_per_second'], result['render_peak_memory_bytes'] / 2 ** 20))
+
+            for metric in ('validate_seconds', 'render_seconds', 'commit_seconds', 'render_peak_memory_bytes'):
+                reference = baseline.get(name, {}).get(metric)
+                if reference and result[metric] > reference * REGRESSION_THRESHOLD:
+                    print('    regression: {0} is {1:.2f}x the baseline'.format(metric, result[metric] / reference))
+                    regressions += 1
+
+    if save_baseline:
+        baseline.update(results)
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=4, sort_keys=True) + '\n')
+        print('Baseline saved to {0}'.format(BASELINE_FILE))
+
+    # Saving a new baseline accepts the current results, regressions included
+    return 1 if regressions and not save_baseline else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Golden-output checks and benchmarks for plugin_bootstrap.')
+    sub_parsers = parser.add_subparsers(dest='action')
+    sub_parsers.add_parser('check', help='compare the rendered files to the golden outputs')
+    sub_parsers.add_parser('update-golden', help='rewrite the golden outputs')
+    bench_parser = sub_parsers.add_parser('bench', help='time the validation, rendering and commit')
+    bench_parser.add_argument('--sizes', default=','.join(SIZES),
+                              help='comma-separated model sizes, among: ' + ', '.join(SIZES))
+    bench_parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+
+    arguments = parser.parse_args()
+
+    if arguments.action == 'check':
+        sys.exit(check())
+    elif arguments.action == 'update-golden':
+        sys.exit(update_golden())
+    elif arguments.action == 'bench':
+        sys.exit(bench(arguments.sizes.split(','), arguments.save_baseline))
+    else:
+        parser.print_help()
@@ -1,90 +1,50 @@
 import yaml
 import sys
-import re
 
 from collections import OrderedDict
 
+from plugin_bootstrap import StringUtils, TypeRef, Literal, ClassLiteral, Call, FieldDecl, ClassDecl, BLANK, \
+    SourceFile, JavaRenderer, RENDERERS
 
-def yaml_config_to_zlib_class(raw_yaml_content):
-    yaml_config = _yaml_ordered_load(raw_yaml_content)
 
-    java_class = '''package ;
+def yaml_config_to_zlib_class(raw_yaml_content, renderer=None):
+    return (renderer or JavaRenderer()).render(yaml_config_to_source(raw_yaml_content))
 
-import fr.zcraft.zlib.components.configuration.Configuration;
-import fr.zcraft.zlib.components.configuration.ConfigurationItem;
-import fr.zcraft.zlib.components.configuration.ConfigurationSection;
-
-import static fr.zcraft.zlib.components.configuration.ConfigurationItem.item;
-import static fr.zcraft.zlib.components.configuration.ConfigurationItem.list;
-import static fr.zcraft.zlib.components.configuration.ConfigurationItem.section;
 
+def yaml_file_config_to_zlib_class(path, renderer=None):
+    with open(path) as f:
+        return yaml_config_to_zlib_class(f.read(), renderer)
 
-/**
- * Configuration.
- *
- * FIXME Auto-generated configuration class, check if it was correctly generated (especially guessed data types).
- *
- * Nota: you can also use specific types directly in this configuration class (like ItemStack, Locale, any Enum,
- * Vector...), and even write your owns.
- * See: fr.zcraft.zlib.components.configuration.ConfigurationValueHandlers
- */
-public class Config extends Configuration
-{
-'''
 
-    java_class += _generate_java_config_class(yaml_config)
+def yaml_config_to_source(raw_yaml_content):
+    """
+    Converts a YAML configuration to the intermediate representation of its zLib configuration class, which can be
+    rendered by any renderer (see plugin_bootstrap.RENDERERS) without parsing the YAML again.
+    """
+    return SourceFile(
+            package='',
+            imports=[
+                'fr.zcraft.zlib.components.configuration.Configuration',
+                'fr.zcraft.zlib.components.configuration.ConfigurationItem',
+                'fr.zcraft.zlib.components.configuration.ConfigurationSection'
+            ],
+            static_imports=[
+                'fr.zcraft.zlib.components.configuration.ConfigurationItem.item',
+                'fr.zcraft.zlib.components.configuration.ConfigurationItem.list',
+                'fr.zcraft.zlib.components.configuration.ConfigurationItem.section'
+            ],
+            classes=[ClassDecl('Config', 'Configuration', _config_members(_yaml_ordered_load(raw_yaml_content)),
+                               doc=_CONFIG_DOC)]
+    )
 
-    java_class += '}'
 
-    return java_class
+_CONFIG_DOC = '''Configuration.
 
+FIXME Auto-generated configuration class, check if it was correctly generated (especially guessed data types).
 
-def yaml_file_config_to_zlib_class(path):
-    with open(path) as f:
-        return yaml_config_to_zlib_class(f.read())
-
-
-# 0: data type class
-# 1: java constant name
-# 2: yaml sub-path
-# 3: default value (with quotes if string) or class if default is null
-_SINGLE_ENTRY = '''static public final ConfigurationItem<{0}> {1} = item("{2}", {3});'''
-
-# 0: data type class
-# 1: java constant name
-# 2: yaml sub-path
-# 3: class type
-_SINGLE_LIST_ENTRY = '''static public final ConfigurationList<{0}> {1} = list("{2}", {3});'''
-
-# 0: data type class
-# 1: java constant name
-# 2: yaml sub-path
-# 3: default value (with quotes if string)
-_SINGLE_SECTION_ENTRY = '''public final ConfigurationItem<{0}> {1} = item("{2}", {3});'''
-
-# 0: data type class
-# 1: java constant name
-# 2: yaml sub-path
-# 3: class type
-_SINGLE_SECTION_LIST_ENTRY = '''public final ConfigurationList<{0}> {1} = list("{2}", {3});'''
-
-# 0: sub-class name
-# 1: java constant name
-# 2: yaml sub-path
-# 3: class content (indented)
-_SECTION_SUB_CLASS = '''static public final {0} {1} = section("{2}", {0}.class);
-static public class {0} extends ConfigurationSection
-{{{3}}}
-'''
-
-# 0: sub-class name
-# 1: java constant name
-# 2: yaml sub-path
-# 3: class content (indented)
-_SECTION_SUB_SUB_CLASS = '''public final {0} {1} = section("{2}", {0}.class);
-static public class {0} extends ConfigurationSection
-{{{3}}}
-'''
+Nota: you can also use specific types directly in this configuration class (like ItemStack, Locale, any Enum,
+Vector...), and even write your owns.
+See: fr.zcraft.zlib.components.configuration.ConfigurationValueHandlers'''
 
 
 def _yaml_ordered_load(stream, Loader=yaml.Loader, object_pairs_hook=OrderedDict):
@@ -102,42 +62,20 @@ def _yaml_ordered_load(stream, Loader=yaml.Loader, object_pairs_hook=OrderedDict
     return yaml.load(stream, OrderedLoader)
 
 
-def _indent(text: str, level):
-    indented = ''
-    for line in text.strip('\n').split('\n'):
-        indented += (' ' * 4 * level) + line + '\n'
-
-    return indented
-
-
-_first_cap_re = re.compile('(.)([A-Z][a-z]+)')
-_all_cap_re = re.compile('([a-z0-9])([A-Z])')
-
-
-def _camel_case_to_snake_case(name):
-    s1 = _first_cap_re.sub(r'\1_\2', name)
-    return _all_cap_re.sub(r'\1_\2', s1).lower()
-
-
-def _create_java_constant_name(name):
-    return _camel_case_to_snake_case(name).upper().replace('-', '_')
-
-
-def _create_java_class_name(name):
-    first, *rest = name.replace('-', '_').split('_')
-    return first[0].upper() + first[1:] + ''.join(word[0].upper() + word[1:] for word in rest)
-
-
-def _python_to_java_type_and_repr(data):
+def _python_to_java_type_and_value(data):
+    """
+    :return: the Java type name, the default value (a Literal, or None if it cannot be expressed), and whether the
+             data is a list.
+    """
     t = type(data)
 
     java_type = '?'
-    java_repr = repr(data)
+    value = Literal(data)
     is_list = False
 
     if t in [str, type(None)]:
         java_type = 'String'
-        java_repr = '"' + (str(data) if data is not None else '') + '"'
+        value = Literal(str(data) if data is not None else '')
 
     elif t is int:
         java_type = 'Integer'
@@ -147,74 +85,70 @@ def _python_to_java_type_and_repr(data):
 
     elif t is bool:
         java_type = 'Boolean'
-        java_repr = 'true' if data else 'false'
 
     elif t in [list, tuple, set]:
         sub_data_type = '?'
 
         if data:
             if t in [list, tuple]:
-                sub_data_type, *_ = _python_to_java_type_and_repr(data[0])
+                sub_data_type, *_ = _python_to_java_type_and_value(data[0])
             else:
-                sub_data_type, *_ = _python_to_java_type_and_repr(data.pop())
+                sub_data_type, *_ = _python_to_java_type_and_value(data.pop())
+
+        value = None
 
         if t is set:
-            java_type = ('List' if t in [list, tuple] else 'Set') + '<' + sub_data_type + '>'
-            java_repr = 'null'
+            java_type = 'Set<' + sub_data_type + '>'
         else:
             java_type = sub_data_type
-            java_repr = 'null'
             is_list = True
 
-    elif t is set:
-        java_type = 'Set<?>'
-        java_repr = 'null'
+    return java_type, value, is_list
 
-    return java_type, java_repr, is_list
 
-
-def _generate_java_config_class(yaml_part: dict, level=1):
-    java_code = ''
+def _config_members(yaml_part: dict, level=1):
+    members = []
 
     for name in yaml_part:
         item = yaml_part[name]
-        t = type(item)
+        path = Literal(str(name))
+        constant_name = StringUtils.create_java_constant_name(name)
 
-        if t not in [dict, OrderedDict]:
-            java_type, java_repr, is_list = _python_to_java_type_and_repr(item)
+        if type(item) not in [dict, OrderedDict]:
+            java_type, value, is_list = _python_to_java_type_and_value(item)
 
             # For lists, or without non-null default value, we have to pass the class type as it cannot
             # be retrieved at runtime due to Java limitations.
-            default_value = java_repr
-            if is_list or java_repr is 'null':
-                default_value = java_type + '.class'
-
-            if is_list:
-                java_model = _SINGLE_LIST_ENTRY if level is 1 else _SINGLE_SECTION_LIST_ENTRY
-            else:
-                java_model = _SINGLE_ENTRY if level is 1 else _SINGLE_SECTION_ENTRY
+            if is_list or value is None:
+                value = ClassLiteral(TypeRef(java_type))
 
-            java_code += java_model.format(java_type, _create_java_constant_name(name), name, default_value)
+            members.append(FieldDecl(
+                    constant_name,
+                    TypeRef('ConfigurationList' if is_list else 'ConfigurationItem', (TypeRef(java_type),)),
+                    Call('list' if is_list else 'item', [path, value]),
+                    static=level == 1
+            ))
 
         else:
-            sub_class = _generate_java_config_class(item, level + 1)
-            java_model = _SECTION_SUB_CLASS if level is 1 else _SECTION_SUB_SUB_CLASS
-
-            java_code += '\n' + java_model.format(
-                    _create_java_class_name(name) + 'Section', _create_java_constant_name(name),
-                    name, '\n' + sub_class
-            )
+            section_class = StringUtils.create_java_class_name(name) + 'Section'
 
-        java_code += '\n'
+            members += [
+                BLANK,
+                FieldDecl(constant_name, TypeRef(section_class),
+                          Call('section', [path, ClassLiteral(TypeRef(section_class))]), static=level == 1),
+                ClassDecl(section_class, 'ConfigurationSection', _config_members(item, level + 1)),
+                BLANK
+            ]
 
-    return _indent(java_code, 1)
+    return members
 
 
 if __name__ == '__main__':
-    if len(sys.argv) <= 1:
-        print('Usage: {0} <path to YAML config file>'.format(sys.argv[0]))
+    if len(sys.argv) <= 1 or (len(sys.argv) > 2 and sys.argv[2] not in RENDERERS):
+        print('Usage: {0} <path to YAML config file> [{1}]'.format(sys.argv[0], '|'.join(RENDERERS)))
     else:
         try:
-            print(yaml_file_config_to_zlib_class(sys.argv[1]))
+            language = sys.argv[2] if len(sys.argv) > 2 else 'java'
+            print(yaml_file_config_to_zlib_class(sys.argv[1], RENDERERS[language]()), end='')
         except FileNotFoundError as e:
             print('Cannot load file {0}'.format(sys.argv[1]), file=sys.stderr)
@@ -1,9 +1,20 @@
+import gc
+import hashlib
+import json
+import os
 import re
+import shutil
+import time
 
 from pathlib import Path
 
 import sys
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 
 class Colors:
     HEADER = '\033[95m'
@@ -16,6 +27,14 @@ class Colors:
     RESET = '\033[0m'
 
 
+class ModelValidationError(Exception):
+    """Raised when a plugin model cannot be generated as-is (invalid names, collisions...)"""
+
+    def __init__(self, problems: list):
+        super().__init__('Invalid plugin model:\n' + '\n'.join(' - ' + problem for problem in problems))
+        self.problems = problems
+
+
 class I:
     """Interaction-related methods"""
 
@@ -45,26 +64,698 @@ class I:
 class StringUtils:
     _first_cap_re = re.compile('(.)([A-Z][a-z]+)')
     _all_cap_re = re.compile('([a-z0-9])([A-Z])')
+    _java_identifier_re = re.compile(r'^(?:[^\W\d]|\$)(?:\w|\$)*\Z')
+
+    JAVA_KEYWORDS = frozenset((
+        'abstract', 'assert', 'boolean', 'break', 'byte', 'case', 'catch', 'char', 'class', 'const', 'continue',
+        'default', 'do', 'double', 'else', 'enum', 'extends', 'final', 'finally', 'float', 'for', 'goto', 'if',
+        'implements', 'import', 'instanceof', 'int', 'interface', 'long', 'native', 'new', 'package', 'private',
+        'protected', 'public', 'return', 'short', 'static', 'strictfp', 'super', 'switch', 'synchronized', 'this',
+        'throw', 'throws', 'transient', 'try', 'void', 'volatile', 'while', 'true', 'false', 'null', '_'
+    ))
 
     @classmethod
     def camel_case_to_snake_case(cls, camel_name):
         s1 = StringUtils._first_cap_re.sub(r'\1_\2', camel_name)
         return StringUtils._all_cap_re.sub(r'\1_\2', s1).lower()
 
+    @classmethod
+    def create_java_constant_name(cls, raw_name):
+        return cls.camel_case_to_snake_case(raw_name).upper().replace('-', '_')
+
     @staticmethod
     def create_java_class_name(raw_name):
         first, *rest = raw_name.replace('-', '_').replace(' ', '_').split('_')
         return first[0].upper() + first[1:] + ''.join(word[0].upper() + word[1:] for word in rest)
 
+    @classmethod
+    def is_java_identifier(cls, name: str):
+        return bool(name) and cls._java_identifier_re.match(name) is not None and name not in cls.JAVA_KEYWORDS
+
     @staticmethod
     def indent(text: str, level):
         indented = ''
         for line in text.strip('\n').split('\n'):
-            indented += (' ' * 4 * level) + line + '\n'
+            indented += ((' ' * 4 * level) + line if line else '') + '\n'
 
         return indented
 
 
+# Intermediate representation of generated code, shared by the code generators: a model is converted into these
+# nodes, which can then be rendered to several languages.
+
+class TypeRef:
+    __slots__ = ('name', 'args')
+
+    def __init__(self, name: str, args: tuple = ()):
+        self.name = name
+        self.args = args
+
+
+class Literal:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Name:
+    """Variable, class or `this` reference"""
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class ClassLiteral:
+    __slots__ = ('type',)
+
+    def __init__(self, type_ref: TypeRef):
+        self.type = type_ref
+
+
+class Call:
+    __slots__ = ('function', 'args', 'target')
+
+    def __init__(self, function: str, args: list, target=None):
+        self.function = function
+        self.args = args
+        self.target = target
+
+
+class New:
+    __slots__ = ('type', 'args')
+
+    def __init__(self, type_ref: TypeRef, args: list = None):
+        self.type = type_ref
+        self.args = args if args is not None else []
+
+
+class Annotation:
+    __slots__ = ('name', 'args')
+
+    def __init__(self, name: str, args: list = None):
+        self.name = name
+        self.args = args if args is not None else []  # (name, expression) pairs
+
+
+class Comment:
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class LocalVar:
+    """Final local variable"""
+    __slots__ = ('name', 'type', 'value')
+
+    def __init__(self, name: str, type_ref: TypeRef, value):
+        self.name = name
+        self.type = type_ref
+        self.value = value
+
+
+class Assign:
+    __slots__ = ('target', 'value')
+
+    def __init__(self, target: str, value):
+        self.target = target
+        self.value = value
+
+
+class Return:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class TryFinally:
+    __slots__ = ('body', 'finally_body')
+
+    def __init__(self, body: list, finally_body: list):
+        self.body = body
+        self.finally_body = finally_body
+
+
+class Param:
+    __slots__ = ('name', 'type')
+
+    def __init__(self, name: str, type_ref: TypeRef):
+        self.name = name
+        self.type = type_ref
+
+
+class MethodDecl:
+    __slots__ = ('name', 'returns', 'params', 'body', 'visibility', 'static', 'override', 'throws')
+
+    def __init__(self, name: str, returns: TypeRef = None, params: list = None, body: list = None,
+                 visibility: str = 'public', static: bool = False, override: bool = False, throws: list = None):
+        self.name = name
+        self.returns = returns  # None for void
+        self.params = params if params is not None else []
+        self.body = body if body is not None else []
+        self.visibility = visibility
+        self.static = static
+        self.override = override
+        self.throws = throws if throws is not None else []
+
+
+class FieldDecl:
+    __slots__ = ('name', 'type', 'value', 'static', 'visibility', 'final')
+
+    def __init__(self, name: str, type_ref: TypeRef, value, static: bool = False, visibility: str = 'public',
+                 final: bool = True):
+        self.name = name
+        self.type = type_ref
+        self.value = value  # None for no initializer
+        self.static = static
+        self.visibility = visibility
+        self.final = final
+
+
+class ClassDecl:
+    __slots__ = ('name', 'superclass', 'members', 'doc', 'interfaces', 'annotations', 'final')
+
+    def __init__(self, name: str, superclass: str = None, members: list = None, doc: str = None,
+                 interfaces: list = None, annotations: list = None, final: bool = False):
+        self.name = name
+        self.superclass = superclass
+        self.members = members if members is not None else []
+        self.doc = doc
+        self.interfaces = interfaces if interfaces is not None else []
+        self.annotations = annotations if annotations is not None else []
+        self.final = final
+
+
+class Blank:
+    """Blank line between members, statements or groups of imports"""
+    __slots__ = ()
+
+
+BLANK = Blank()
+
+
+class SourceFile:
+    __slots__ = ('package', 'imports', 'static_imports', 'classes')
+
+    def __init__(self, package: str, imports: list = None, static_imports: list = None, classes: list = None):
+        self.package = package
+        self.imports = imports if imports is not None else []
+        self.static_imports = static_imports if static_imports is not None else []
+        self.classes = classes if classes is not None else []
+
+
+class GeneratedFile:
+    __slots__ = ('path', 'content')
+
+    def __init__(self, path: Path, content: str):
+        self.path = path
+        self.content = content
+
+
+class JavaRenderer:
+    extension = '.java'
+
+    INDENTATION = '    '
+    ANNOTATION_ARGUMENTS = ' ({0})'
+
+    def __init__(self):
+        # Renderers by node type: nodes are dispatched on their exact type rather than through isinstance() checks
+        self._member_renderers = {Comment: self._comment, FieldDecl: self._field, MethodDecl: self._method,
+                                  ClassDecl: self._class}
+        self._statement_renderers = {Comment: self._comment, Return: self._return, LocalVar: self._local_var,
+                                     Assign: self._assign, TryFinally: self._try_finally}
+        self._expression_renderers = {Call: self._call, Name: self._name, Literal: self._literal, New: self._new,
+                                      ClassLiteral: self._class_literal}
+
+    def render(self, source: SourceFile):
+        lines = ['package ' + source.package + ';', '']
+
+        if source.imports:
+            self._imports(lines, source.imports, 'import ', ';')
+        if source.static_imports:
+            self._imports(lines, source.static_imports, 'import static ', ';')
+
+        lines.append('')
+
+        for class_decl in source.classes:
+            self._doc(lines, class_decl.doc)
+            self._class(lines, class_decl, '', top_level=True)
+
+        lines.append('')
+        return '\n'.join(lines)
+
+    def _class(self, lines: list, class_decl: ClassDecl, indent: str, top_level: bool = False):
+        self._annotations(lines, class_decl.annotations, indent)
+        lines.append(indent + ('public ' if top_level else 'public static ')
+                     + ('final class ' if class_decl.final else 'class ') + class_decl.name + self._extends(class_decl))
+        lines.append(indent + '{')
+        self._members(lines, class_decl.members, indent + self.INDENTATION)
+        lines.append(indent + '}')
+
+    def _members(self, lines: list, members: list, indent: str):
+        if not members or members[0] is BLANK or members[-1] is BLANK:
+            members = self._trimmed(members)
+            if not members:
+                lines.append('')
+
+        renderers = self._member_renderers
+        for member in members:
+            if member is BLANK:
+                lines.append('')
+            else:
+                renderers[type(member)](lines, member, indent)
+
+    def _field(self, lines: list, field: FieldDecl, indent: str):
+        lines.append(indent + field.visibility + (' static ' if field.static else ' ')
+                     + ('final ' if field.final else '') + self._type(field.type) + ' ' + field.name
+                     + (' = ' + self._expression(field.value) + ';' if field.value is not None else ';'))
+
+    def _method(self, lines: list, method: MethodDecl, indent: str):
+        if method.override:
+            lines.append(indent + '@Override')
+
+        lines.append(indent + method.visibility + (' static ' if method.static else ' ')
+                     + (self._type(method.returns) if method.returns else 'void') + ' ' + method.name + '('
+                     + (', '.join([self._type(param.type) + ' ' + param.name for param in method.params])
+                        if method.params else '') + ')'
+                     + (' throws ' + ', '.join(method.throws) if method.throws else ''))
+        lines.append(indent + '{')
+        self._statements(lines, method.body, indent + self.INDENTATION)
+        lines.append(indent + '}')
+
+    def _statements(self, lines: list, statements: list, indent: str):
+        if not statements or statements[0] is BLANK or statements[-1] is BLANK:
+            statements = self._trimmed(statements)
+            if not statements:
+                lines.append('')
+
+        renderers = self._statement_renderers
+        for statement in statements:
+            if statement is BLANK:
+                lines.append('')
+            else:
+                renderers.get(type(statement), self._expression_statement)(lines, statement, indent)
+
+    def _return(self, lines: list, statement: Return, indent: str):
+        lines.append(indent + 'return ' + self._expression(statement.value) + ';')
+
+    def _local_var(self, lines: list, statement: LocalVar, indent: str):
+        lines.append(indent + 'final ' + self._type(statement.type) + ' ' + statement.name + ' = '
+                     + self._expression(statement.value) + ';')
+
+    def _assign(self, lines: list, statement: Assign, indent: str):
+        lines.append(indent + statement.target + ' = ' + self._expression(statement.value) + ';')
+
+    def _try_finally(self, lines: list, statement: TryFinally, indent: str):
+        lines += [indent + 'try', indent + '{']
+        self._statements(lines, statement.body, indent + self.INDENTATION)
+        lines += [indent + '}', indent + 'finally', indent + '{']
+        self._statements(lines, statement.finally_body, indent + self.INDENTATION)
+        lines.append(indent + '}')
+
+    def _expression_statement(self, lines: list, expression, indent: str):
+        lines.append(indent + self._expression(expression) + ';')
+
+    def _expression(self, expression):
+        # String literals are the most common expressions, and rendered without going through the dispatch
+        if type(expression) is Literal and isinstance(expression.value, str):
+            return self._string(expression.value)
+
+        return self._expression_renderers[type(expression)](expression)
+
+    def _call(self, expression: Call):
+        return (self._expression(expression.target) + '.' if expression.target else '') + expression.function \
+            + '(' + self._arguments(expression.args) + ')'
+
+    @staticmethod
+    def _name(expression: Name):
+        return expression.name
+
+    def _literal(self, expression: Literal):
+        value = expression.value
+        if isinstance(value, str):
+            return self._string(value)
+        elif isinstance(value, bool):
+            return 'true' if value else 'false'
+        elif value is None:
+            return 'null'
+
+        return repr(value)
+
+    def _new(self, expression: New):
+        return 'new ' + self._type(expression.type) + '(' + self._arguments(expression.args) + ')'
+
+    def _class_literal(self, expression: ClassLiteral):
+        return self._raw_type(expression.type) + '.class'
+
+    @staticmethod
+    def _string(value: str):
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r') \
+            .replace('\t', '\\t') + '"'
+
+    def _arguments(self, args: list):
+        return ', '.join(map(self._expression, args)) if args else ''
+
+    def _type(self, type_ref: TypeRef):
+        if not type_ref.args:
+            return type_ref.name
+
+        return type_ref.name + '<' + ', '.join(map(self._type, type_ref.args)) + '>'
+
+    @staticmethod
+    def _raw_type(type_ref: TypeRef):
+        """The type without its type arguments, as class literals cannot have any"""
+        return type_ref.name.split('<', 1)[0] if '<' in type_ref.name else type_ref.name
+
+    def _annotations(self, lines: list, annotations: list, indent: str):
+        for annotation in annotations:
+            args = ', '.join([name + ' = ' + self._expression(value) for name, value in annotation.args])
+            lines.append(indent + '@' + annotation.name + (self.ANNOTATION_ARGUMENTS.format(args) if args else ''))
+
+    @staticmethod
+    def _trimmed(items: list):
+        """The items without leading and trailing blank lines"""
+        start, end = 0, len(items)
+        while start < end and items[start] is BLANK:
+            start += 1
+        while end > start and items[end - 1] is BLANK:
+            end -= 1
+
+        return items[start:end]
+
+    @staticmethod
+    def _imports(lines: list, names: list, prefix: str, suffix: str):
+        lines += ['' if name is BLANK else prefix + name + suffix for name in names]
+        lines.append('')
+
+    @staticmethod
+    def _comment(lines: list, comment: Comment, indent: str):
+        if '\n' not in comment.text:
+            lines.append(indent + '// ' + comment.text if comment.text else indent + '//')
+        else:
+            lines += [indent + '// ' + line if line else indent + '//' for line in comment.text.split('\n')]
+
+    @staticmethod
+    def _extends(class_decl: ClassDecl):
+        return (' extends ' + class_decl.superclass if class_decl.superclass else '') \
+            + (' implements ' + ', '.join(class_decl.interfaces) if class_decl.interfaces else '')
+
+    @staticmethod
+    def _doc(lines: list, doc: str):
+        if doc:
+            lines.append('/**')
+            lines += [' * ' + line if line else ' *' for line in doc.split('\n')]
+            lines.append(' */')
+
+
+class KotlinRenderer(JavaRenderer):
+    extension = '.kt'
+
+    ANNOTATION_ARGUMENTS = '({0})'
+
+    # Kotlin types of the Java boxed types, for which the class literal must be the boxed one
+    BOXED_TYPES = {'Boolean': 'Boolean', 'Integer': 'Int', 'Long': 'Long', 'Double': 'Double'}
+
+    # Kotlin types of the Java primitive types (void is rendered as no return type)
+    PRIMITIVE_TYPES = {'boolean': 'Boolean', 'int': 'Int', 'long': 'Long', 'double': 'Double'}
+
+    # Java types mapped to Kotlin ones, which must not be imported
+    MAPPED_IMPORTS = {'java.util.List', 'java.util.Map', 'java.util.Set'}
+
+    def render(self, source: SourceFile):
+        lines = ['package ' + source.package, ''] if source.package else []
+
+        imports = []
+        for name in source.imports + source.static_imports:
+            if name in self.MAPPED_IMPORTS or (name is BLANK and (not imports or imports[-1] is BLANK)):
+                continue
+            imports.append(name)
+
+        if imports and imports[-1] is BLANK:
+            imports.pop()
+        if imports:
+            self._imports(lines, imports, 'import ', '')
+
+        lines.append('')
+
+        for class_decl in source.classes:
+            self._doc(lines, class_decl.doc)
+            self._class(lines, class_decl, '', top_level=True)
+
+        lines.append('')
+        return '\n'.join(lines)
+
+    def _class(self, lines: list, class_decl: ClassDecl, indent: str, top_level: bool = False):
+        members = [member for member in class_decl.members if isinstance(member, (FieldDecl, MethodDecl))]
+        static_members = [member for member in members if member.static]
+
+        # Classes with static members only (like the Java configuration classes) are singletons in Kotlin; the other
+        # ones get the static members in their companion object.
+        singleton = top_level and members and len(static_members) == len(members)
+
+        self._annotations(lines, class_decl.annotations, indent)
+        lines.append(indent + ('object ' if singleton else 'class ') + class_decl.name + self._extends(class_decl)
+                     + ' {')
+
+        inner_indent = indent + self.INDENTATION
+        if singleton or not static_members:
+            self._members(lines, class_decl.members, inner_indent)
+        else:
+            self._members(lines, self._spaced([member for member in class_decl.members
+                                               if member not in static_members]), inner_indent)
+            lines += ['', inner_indent + 'companion object {']
+            self._members(lines, self._spaced(static_members), inner_indent + self.INDENTATION)
+            lines.append(inner_indent + '}')
+
+        lines.append(indent + '}')
+
+    def _field(self, lines: list, field: FieldDecl, indent: str):
+        if field.final and field.value is not None:
+            lines.append(indent + ('@JvmField val ' if field.visibility == 'public' else field.visibility + ' val ')
+                         + field.name + ' = ' + self._expression(field.value))
+        else:
+            lines.append(indent + self._visibility(field.visibility) + 'var ' + field.name + ': '
+                         + self._nullable_type(field.type) + ' = '
+                         + (self._expression(field.value) if field.value is not None else 'null'))
+
+    def _method(self, lines: list, method: MethodDecl, indent: str):
+        lines.append(indent + ('@JvmStatic ' if method.static else '') + self._visibility(method.visibility)
+                     + ('override fun ' if method.override else 'fun ') + method.name + '('
+                     + (', '.join([param.name + ': ' + self._type(param.type) for param in method.params])
+                        if method.params else '') + ')'
+                     + (': ' + self._nullable_type(method.returns) if method.returns else '') + ' {')
+        self._statements(lines, method.body, indent + self.INDENTATION)
+        lines.append(indent + '}')
+
+    def _return(self, lines: list, statement: Return, indent: str):
+        lines.append(indent + 'return ' + self._expression(statement.value))
+
+    def _local_var(self, lines: list, statement: LocalVar, indent: str):
+        lines.append(indent + 'val ' + statement.name + ' = ' + self._expression(statement.value))
+
+    def _assign(self, lines: list, statement: Assign, indent: str):
+        lines.append(indent + statement.target + ' = ' + self._expression(statement.value))
+
+    def _try_finally(self, lines: list, statement: TryFinally, indent: str):
+        lines.append(indent + 'try {')
+        self._statements(lines, statement.body, indent + self.INDENTATION)
+        lines.append(indent + '} finally {')
+        self._statements(lines, statement.finally_body, indent + self.INDENTATION)
+        lines.append(indent + '}')
+
+    def _expression_statement(self, lines: list, expression, indent: str):
+        lines.append(indent + self._expression(expression))
+
+    def _new(self, expression: New):
+        return self._type(expression.type) + '(' + self._arguments(expression.args) + ')'
+
+    def _class_literal(self, expression: ClassLiteral):
+        if expression.type.name in self.BOXED_TYPES:
+            return self.BOXED_TYPES[expression.type.name] + '::class.javaObjectType'
+        elif expression.type.name == '?':
+            return 'Any::class.java'
+
+        return self._raw_type(expression.type) + '::class.java'
+
+    def _string(self, value: str):
+        # $ starts a string template in Kotlin
+        return super()._string(value).replace('$', '\\$')
+
+    def _type(self, type_ref: TypeRef):
+        if type_ref.name.endswith('[]'):
+            return 'Array<' + self._type(TypeRef(type_ref.name[:-2], type_ref.args)) + '>'
+
+        return super()._type(TypeRef(self.PRIMITIVE_TYPES.get(type_ref.name, type_ref.name), type_ref.args))
+
+    def _nullable_type(self, type_ref: TypeRef):
+        """Java references can be null, unlike primitives"""
+        return self._type(type_ref) + ('' if type_ref.name in self.PRIMITIVE_TYPES else '?')
+
+    @staticmethod
+    def _spaced(members: list):
+        """Members with a blank line around methods and classes, but not between consecutive fields."""
+        spaced = []
+
+        for member in members:
+            if member is BLANK:
+                continue
+            if spaced and not (isinstance(member, FieldDecl) and isinstance(spaced[-1], FieldDecl)):
+                spaced.append(BLANK)
+            spaced.append(member)
+
+        return spaced
+
+    @staticmethod
+    def _visibility(visibility: str):
+        return '' if visibility == 'public' else visibility + ' '
+
+    @staticmethod
+    def _extends(class_decl: ClassDecl):
+        supertypes = ([class_decl.superclass + '()'] if class_decl.superclass else []) + class_decl.interfaces
+        return ' : ' + ', '.join(supertypes) if supertypes else ''
+
+
+RENDERERS = {'java': JavaRenderer, 'kotlin': KotlinRenderer}
+
+
+class JsonLinesSink:
+    """
+    Generator hook writing every event as a JSON object on its own line.
+
+    Usage: generator.add_hook(JsonLinesSink(open('events.jsonl', 'w')))
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __call__(self, event: dict):
+        self.stream.write(json.dumps(event, default=str, sort_keys=True) + '\n')
+        self.stream.flush()
+
+
+class ContentStore:
+    """
+    Content-addressed store shared by several generated projects.
+
+    Every file is hashed and stored once under the store folder; the projects' files are then materialized as
+    reflinks (copy-on-write clones, where the file system supports them), else as hard links, else as plain copies
+    (e.g. across file systems).
+
+    Hard links are opt-in (hard_links=True), as hard-linked files share their content: stored objects are read-only,
+    so a tool modifying a project file in place fails instead of modifying every project (editors replacing files on
+    save are fine). Objects modified anyway are detected, and rewritten, when their content is stored again.
+    """
+
+    FICLONE = 0x40049409  # Linux ioctl, see ioctl_ficlone(2)
+
+    def __init__(self, folder: Path, hard_links: bool = False):
+        self.folder = folder
+        self.hard_links = hard_links
+
+        self._objects = {}  # hash -> object path, for objects known to exist
+
+        self.files = 0
+        self.reflinked = 0
+        self.linked = 0
+        self.copied = 0
+        self.bytes_total = 0
+        self.bytes_stored = 0
+        self.bytes_copied = 0
+
+    @property
+    def bytes_saved(self):
+        return self.bytes_total - self.bytes_stored - self.bytes_copied
+
+    def materialize(self, content: bytes, path: Path):
+        """
+        Writes the content to the given path, through the store.
+
+        :return: the method used: 'reflink', 'link' or 'copy'.
+        """
+        obj = self._store(content)
+
+        if path.exists() or path.is_symlink():
+            if path.is_file() and os.path.samefile(str(obj), str(path)):
+                method = 'link'
+                self._count(method, len(content))
+                return method
+            path.unlink()
+
+        method = 'copy'
+        try:
+            self._reflink(obj, path)
+            method = 'reflink'
+        except OSError:
+            if self.hard_links:
+                try:
+                    os.link(str(obj), str(path))
+                    method = 'link'
+                except OSError:
+                    pass
+
+        if method == 'copy':
+            shutil.copyfile(str(obj), str(path))
+
+        self._count(method, len(content))
+        return method
+
+    def report(self):
+        return 'Content store {0}: {1} files ({2} reflinked, {3} hard-linked, {4} copied), ' \
+               '{5} bytes written, {6} bytes stored, {7} bytes saved'.format(
+                    str(self.folder), self.files, self.reflinked, self.linked, self.copied,
+                    self.bytes_total, self.bytes_stored + self.bytes_copied, self.bytes_saved)
+
+    def _count(self, method: str, size: int):
+        self.files += 1
+        self.bytes_total += size
+
+        if method == 'reflink':
+            self.reflinked += 1
+        elif method == 'link':
+            self.linked += 1
+        else:
+            self.copied += 1
+            self.bytes_copied += size
+
+    def _store(self, content: bytes):
+        digest = hashlib.sha256(content).hexdigest()
+
+        obj = self._objects.get(digest)
+        if obj is not None:
+            return obj
+
+        obj = self.folder / 'objects' / digest[:2] / digest[2:]
+        if not obj.exists() or hashlib.sha256(obj.read_bytes()).hexdigest() != digest:
+            obj.parent.mkdir(parents=True, exist_ok=True)
+
+            temporary = obj.with_name(obj.name + '.tmp' + str(os.getpid()))
+            with temporary.open(mode='wb') as f:
+                f.write(content)
+            os.chmod(str(temporary), 0o444)
+            os.replace(str(temporary), str(obj))
+
+            self.bytes_stored += len(content)
+
+        self._objects[digest] = obj
+        return obj
+
+    @classmethod
+    def _reflink(cls, source: Path, destination: Path):
+        if fcntl is None:
+            raise OSError('reflinks are not supported on this platform')
+
+        try:
+            with source.open(mode='rb') as src, destination.open(mode='wb') as dst:
+                fcntl.ioctl(dst.fileno(), cls.FICLONE, src.fileno())
+        except OSError:
+            if destination.exists():
+                destination.unlink()
+            raise
+
+
 class BukkitPluginGenerator:
     GITIGNORE_TEMPLATE = '''# Created by the zLib plugin bootstrap generator
 # Inspired by https://www.gitignore.io/api/java,maven,intellij,eclipse,netbeans
@@ -236,12 +927,17 @@ hs_err_pid*
     MAVEN_ZLIB_SHADING_TEMPLATE = '''
     <build>
         <plugins>
-            <plugin>
+{plugins}
+        </plugins>
+    </build>
+'''
+
+    MAVEN_ZLIB_SHADE_PLUGIN_TEMPLATE = '''            <plugin>
                 <groupId>org.apache.maven.plugins</groupId>
                 <artifactId>maven-shade-plugin</artifactId>
                 <version>2.3</version>
                 <configuration>
-                    <minimizeJar>true</minimizeJar>
+                    <minimizeJar>{minimize_jar}</minimizeJar>
                     <artifactSet>
                         <includes>
                             <include>fr.zcraft:zlib</include>
@@ -262,9 +958,45 @@ hs_err_pid*
                         </goals>
                     </execution>
                 </executions>
-            </plugin>
-        </plugins>
-    </build>
+            </plugin>'''
+
+    MAVEN_PROFILES_TEMPLATE = '''
+    <profiles>{release_profile}
+        <!-- Fast development builds: mvn package -Pdev -->
+        <profile>
+            <id>dev</id>
+            <build>
+                <plugins>
+                    <plugin>
+                        <groupId>org.apache.maven.plugins</groupId>
+                        <artifactId>maven-compiler-plugin</artifactId>
+                        <version>3.8.1</version>
+                        <configuration>
+                            <!-- Inverted flag (MCOMPILER-209): false only recompiles the changed sources -->
+                            <useIncrementalCompilation>false</useIncrementalCompilation>
+                        </configuration>
+                    </plugin>{dev_plugins}
+                </plugins>
+            </build>
+        </profile>
+    </profiles>
+'''
+
+    MAVEN_RELEASE_PROFILE_TEMPLATE = '''
+        <!-- Full shaded and minimized artifact, built unless another profile is selected -->
+        <profile>
+            <id>release</id>
+            <activation>
+                <activeByDefault>true</activeByDefault>
+            </activation>
+{build}
+        </profile>
+'''
+
+    MAVEN_CONFIG_TEMPLATE = '''-T1C
+'''
+
+    MAVEN_JVM_CONFIG_TEMPLATE = '''-XX:+TieredCompilation -XX:TieredStopAtLevel=1 -Xss4m
 '''
 
     MAVEN_ZLIB_REPO_TEMPLATE = '''
@@ -280,96 +1012,1065 @@ hs_err_pid*
             <version>0.99-SNAPSHOT</version>
         </dependency>'''
 
-    MAIN_CLASS_TEMPLATE = '''package {package};
-
-{imports}
+    GITIGNORE_GRADLE_TEMPLATE = '''
 
+### Gradle ###
 
-public final class {class_name} extends {base_class}
-{{
-    private static {class_name} instance;
+.gradle/
+build/
+!gradle/wrapper/gradle-wrapper.jar
+'''
 
-    @Override
-    public void onEnable()
-    {{
-        instance = this;{on_enable}
-    }}
+    GRADLE_SETTINGS_TEMPLATE = '''rootProject.name = "{artifactId}"
 
-    public static {class_name} get()
-    {{
-        return instance;
+buildCache {{
+    local {{
+        isEnabled = true
     }}
 }}
 '''
 
-    LISTENER_TEMPLATE = '''package {package};
+    GRADLE_PROPERTIES_TEMPLATE = '''org.gradle.caching=true
+org.gradle.configuration-cache=true
+org.gradle.parallel=true
+org.gradle.jvmargs=-Xmx1g -Dfile.encoding=UTF-8
+'''
 
-import org.bukkit.event.Listener;
-{imports}
+    GRADLE_BUILD_TEMPLATE = '''plugins {{
+    java{zlib_plugin}
+}}
 
-public final class {class_name} {extends}implements Listener
-{{
-    // TODO implement events listeners
+group = "{groupId}"
+version = "{version}"
+
+java {{
+    sourceCompatibility = JavaVersion.toVersion("{java_version}")
+    targetCompatibility = JavaVersion.toVersion("{java_version}")
 }}
-'''
 
-    COMMAND_ZLIB_TEMPLATE = '''package {package};
+repositories {{
+    maven("https://hub.spigotmc.org/nexus/content/groups/public/"){zlib_repo}
+}}
 
-import fr.zcraft.zlib.components.commands.Command;
-import fr.zcraft.zlib.components.commands.CommandException;
-import fr.zcraft.zlib.components.commands.CommandInfo;
+dependencies {{
+    compileOnly("org.bukkit:bukkit:1.9-R0.1-SNAPSHOT"){zlib_dependency}
+}}
 
-import java.util.List;
+tasks.withType<JavaCompile>().configureEach {{
+    options.encoding = "UTF-8"
+}}
+{build}'''
 
+    GRADLE_ZLIB_PLUGIN_TEMPLATE = '''
+    id("com.gradleup.shadow") version "8.3.5"'''
 
-@CommandInfo (name = "{sub_command_name}", usageParameters = "")
-public final class {class_name} extends Command
-{{
-    @Override
-    protected void run() throws CommandException
-    {{
-        // TODO implement command /{command_name} {sub_command_name}
-    }}
+    GRADLE_ZLIB_SHADOW_TEMPLATE = '''
+tasks.jar {{
+    archiveClassifier.set("original")
+}}
 
-    @Override
-    protected List<String> complete() throws CommandException
-    {{
-        // TODO implement auto-completion for /{command_name} {sub_command_name}
-        return null;
+tasks.shadowJar {{
+    archiveClassifier.set("")
+    dependencies {{
+        include(dependency("fr.zcraft:zlib"))
     }}
+    minimize()
+    relocate("fr.zcraft.zlib", "{pckg}.zlib")
+}}
+
+tasks.assemble {{
+    dependsOn(tasks.shadowJar)
 }}
 '''
 
-    COMMAND_BUKKIT_TEMPLATE = '''package {package};
+    GRADLE_ZLIB_REPO_TEMPLATE = '''
+    maven("http://maven.carrade.eu/artifactory/snapshots") {
+        isAllowInsecureProtocol = true
+    }'''
 
-import org.bukkit.command.Command;
-import org.bukkit.command.CommandExecutor;
-import org.bukkit.command.CommandSender;
-import org.bukkit.command.TabCompleter;
+    GRADLE_ZLIB_DEPENDENCY_TEMPLATE = '''
+    implementation("fr.zcraft:zlib:0.99-SNAPSHOT")'''
 
-import java.util.List;
+    BUILD_SYSTEMS = ('maven', 'gradle')
 
+    # Attributes the generated files depend on: changing one of them invalidates the model built by render()
+    OPTIONS = ('folder', 'name', 'package', 'main_class', 'version', 'author', 'website', 'description',
+               'load_at_startup', 'zlib', 'java_version', 'gitignore', 'build_system', 'task_scheduler', 'persistence',
+               'instrumentation', 'admin_command', 'fast_dev_build')
 
-public class {class_name} implements CommandExecutor, TabCompleter
+    GRADLE_FILES = ('settings.gradle.kts', 'build.gradle.kts', 'gradle.properties')
+
+    TICK_SCHEDULER_CLASS = 'TickScheduler'
+    PERSISTENCE_CLASS = 'PlayerDataStore'
+    TIMINGS_CLASS = 'Timings'
+    TIMINGS_SUB_COMMAND = 'timings'
+    SUB_COMMAND_INTERFACE = 'SubCommand'
+    PREFIX_TRIE_CLASS = 'PrefixTrie'
+
+    TICK_SCHEDULER_TEMPLATE = '''package {package};
+
+import org.bukkit.Bukkit;
+import org.bukkit.plugin.Plugin;
+import org.bukkit.scheduler.BukkitTask;
+{imports}
+import java.util.Queue;
+import java.util.concurrent.Callable;
+import java.util.concurrent.ConcurrentLinkedQueue;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.logging.Level;
+
+
+/**
+ * Runs heavy work on the main thread without lag spikes: submitted tasks are queued, and the queue is drained each
+ * tick until the tick budget (in nanoseconds) is exhausted. Remaining tasks wait for the next tick.
+ *
+ * Split bulk block or entity operations into small tasks and {{@link #submit(Runnable)}} them; run everything not
+ * touching the Bukkit API off the main thread with {{@link #runAsync(Runnable)}} or
+ * {{@link #supplyAsync(Callable, Callback)}}.
+ */
+public final class {class_name} {extends}implements Runnable
 {{
-    @Override
-    public boolean onCommand(CommandSender sender, Command cmd, String label, String[] args)
-    {{
-        // TODO implement command /{command_name}
-    }}
+    /**
+     * Default budget per tick: 10 ms out of the 50 ms of a tick.
+     */
+    public static final long DEFAULT_BUDGET_NANOS = 10000000L;
 
-    @Override
-    public List<String> onTabComplete(CommandSender sender, Command cmd, String label, String[] args)
+    private static {class_name} instance;
+
+    private final Queue<Runnable> queue = new ConcurrentLinkedQueue<>();
+    private final AtomicLong backlog = new AtomicLong();
+
+    private volatile long budgetNanos = DEFAULT_BUDGET_NANOS;
+    private volatile long executed = 0;
+    private volatile long overruns = 0;
+    private volatile long maxTickNanos = 0;
+
+    private Plugin plugin;
+    private BukkitTask task;
+{lifecycle}
+
+    /**
+     * Queues a task to be executed on the main thread, within the tick budget. Thread-safe.
+     *
+     * @param work The task.
+     */
+    public static void submit(Runnable work)
+    {{
+        instance.queue.add(work);
+        instance.backlog.incrementAndGet();
+    }}
+
+    /**
+     * Runs a task off the main thread. It must not use the Bukkit API.
+     *
+     * @param work The task.
+     */
+    public static void runAsync(Runnable work)
+    {{
+        Bukkit.getScheduler().runTaskAsynchronously(instance.plugin, work);
+    }}
+
+    /**
+     * Computes a value off the main thread, then hands it to the callback on the main thread, within the tick
+     * budget.
+     *
+     * @param work The computation. It must not use the Bukkit API.
+     * @param then The callback, called on the main thread with the computed value.
+     * @param <T> The computed value type.
+     */
+    public static <T> void supplyAsync(final Callable<T> work, final Callback<T> then)
+    {{
+        runAsync(new Runnable() {{
+            @Override
+            public void run()
+            {{
+                try
+                {{
+                    final T value = work.call();
+                    submit(new Runnable() {{
+                        @Override
+                        public void run()
+                        {{
+                            then.accept(value);
+                        }}
+                    }});
+                }}
+                catch (Exception e)
+                {{
+                    instance.plugin.getLogger().log(Level.SEVERE, "Asynchronous task failed", e);
+                }}
+            }}
+        }});
+    }}
+
+    @Override
+    public void run()
+    {{
+        final long start = System.nanoTime();
+        final long deadline = start + budgetNanos;
+
+        Runnable work;
+        while ((work = queue.poll()) != null)
+        {{
+            backlog.decrementAndGet();
+
+            try
+            {{
+                work.run();
+            }}
+            catch (Throwable t)
+            {{
+                plugin.getLogger().log(Level.SEVERE, "Scheduled task failed", t);
+            }}
+
+            executed++;
+
+            if (System.nanoTime() - deadline >= 0) break;
+        }}
+
+        final long elapsed = System.nanoTime() - start;
+        if (elapsed > budgetNanos) overruns++;
+        if (elapsed > maxTickNanos) maxTickNanos = elapsed;
+    }}
+
+    /**
+     * @param budgetNanos The time, in nanoseconds, the queue may use each tick.
+     */
+    public static void setBudgetNanos(long budgetNanos)
+    {{
+        instance.budgetNanos = budgetNanos;
+    }}
+
+    /**
+     * @return The number of tasks waiting to be executed.
+     */
+    public static long getBacklog()
+    {{
+        return instance.backlog.get();
+    }}
+
+    /**
+     * @return The number of tasks executed since the plugin was enabled.
+     */
+    public static long getExecuted()
+    {{
+        return instance.executed;
+    }}
+
+    /**
+     * @return The number of ticks where the queue exceeded its budget (a single task longer than the budget does).
+     */
+    public static long getOverruns()
+    {{
+        return instance.overruns;
+    }}
+
+    /**
+     * @return The longest time, in nanoseconds, spent draining the queue in a single tick.
+     */
+    public static long getMaxTickNanos()
+    {{
+        return instance.maxTickNanos;
+    }}
+
+    public interface Callback<T>
+    {{
+        void accept(T value);
+    }}
+}}
+'''
+
+    TICK_SCHEDULER_ZLIB_LIFECYCLE_TEMPLATE = '''
+    @Override
+    protected void onEnable()
+    {{
+        instance = this;
+        plugin = ZLib.getPlugin();
+        task = Bukkit.getScheduler().runTaskTimer(plugin, this, 1L, 1L);
+    }}
+
+    @Override
+    protected void onDisable()
+    {{
+        if (task != null) task.cancel();
+        queue.clear();
+        backlog.set(0);
+    }}'''
+
+    TICK_SCHEDULER_BUKKIT_LIFECYCLE_TEMPLATE = '''
+    private {class_name}() {{}}
+
+    /**
+     * Starts the scheduler. Call it when the plugin is enabled.
+     *
+     * @param plugin The plugin owning the scheduler task.
+     */
+    public static void start(Plugin plugin)
+    {{
+        instance = new {class_name}();
+        instance.plugin = plugin;
+        instance.task = Bukkit.getScheduler().runTaskTimer(plugin, instance, 1L, 1L);
+    }}
+
+    /**
+     * Stops the scheduler and drops the pending tasks. Call it when the plugin is disabled.
+     */
+    public static void stop()
+    {{
+        if (instance.task != null) instance.task.cancel();
+        instance.queue.clear();
+        instance.backlog.set(0);
+    }}'''
+
+    PERSISTENCE_TEMPLATE = '''package {package};
+
+import org.bukkit.Bukkit;
+import org.bukkit.configuration.InvalidConfigurationException;
+import org.bukkit.configuration.file.YamlConfiguration;
+import org.bukkit.event.EventHandler;
+import org.bukkit.event.EventPriority;
+import org.bukkit.event.Listener;
+import org.bukkit.event.player.AsyncPlayerPreLoginEvent;
+import org.bukkit.event.player.PlayerQuitEvent;
+import org.bukkit.plugin.Plugin;
+import org.bukkit.scheduler.BukkitTask;
+{imports}
+import java.io.File;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.OutputStreamWriter;
+import java.io.Writer;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.AtomicMoveNotSupportedException;
+import java.nio.file.Files;
+import java.nio.file.StandardCopyOption;
+import java.util.Collections;
+import java.util.HashMap;
+import java.util.Map;
+import java.util.Set;
+import java.util.UUID;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ConcurrentMap;
+import java.util.logging.Level;
+
+
+/**
+ * Stores players data without blocking the main thread.
+ *
+ * Data is loaded when players log in (off the main thread), kept in memory, and modified records are written to
+ * disk in batches, asynchronously, every {{@link #FLUSH_INTERVAL_TICKS}} ticks and when the plugin is disabled.
+ * Files are written atomically: a crash never leaves a half-written file.
+ *
+ * Usage: modify {{@link #get(UUID)}}, then call {{@link #markDirty(UUID)}}. Both must be called from the main thread.
+ */
+public final class {class_name} {extends}implements Listener
+{{
+    /**
+     * Delay between two flushes of the modified records: 30 seconds.
+     */
+    public static final long FLUSH_INTERVAL_TICKS = 20L * 30;
+
+    private static {class_name} instance;
+
+    private final ConcurrentMap<UUID, YamlConfiguration> loaded = new ConcurrentHashMap<>();
+    private final Set<UUID> dirty = Collections.newSetFromMap(new ConcurrentHashMap<UUID, Boolean>());
+    private final Set<UUID> unloading = Collections.newSetFromMap(new ConcurrentHashMap<UUID, Boolean>());
+
+    // Snapshots scheduled for writing but not written yet, so a player re-joining meanwhile gets fresh data.
+    private final ConcurrentMap<UUID, String> pending = new ConcurrentHashMap<>();
+    private final Object writeLock = new Object();
+
+    private Plugin plugin;
+    private File folder;
+    private BukkitTask task;
+{lifecycle}
+
+    /**
+     * Returns the data of a player. If the player is not online, the data is loaded synchronously, and unloaded
+     * with the next flush.
+     *
+     * @param id The player's UUID.
+     * @return The player's data, to be modified in place.
+     */
+    public static YamlConfiguration get(UUID id)
+    {{
+        YamlConfiguration data = instance.loaded.get(id);
+        if (data == null)
+        {{
+            data = instance.read(id);
+            final YamlConfiguration existing = instance.loaded.putIfAbsent(id, data);
+            if (existing != null) data = existing;
+        }}
+
+        if (Bukkit.getPlayer(id) == null) instance.unloading.add(id);
+
+        return data;
+    }}
+
+    /**
+     * Schedules the data of a player to be saved with the next flush.
+     *
+     * @param id The player's UUID.
+     */
+    public static void markDirty(UUID id)
+    {{
+        instance.dirty.add(id);
+    }}
+
+    @EventHandler (priority = EventPriority.MONITOR)
+    public void onPlayerPreLogin(AsyncPlayerPreLoginEvent ev)
+    {{
+        if (ev.getLoginResult() == AsyncPlayerPreLoginEvent.Result.ALLOWED && !loaded.containsKey(ev.getUniqueId()))
+        {{
+            loaded.putIfAbsent(ev.getUniqueId(), read(ev.getUniqueId()));
+        }}
+    }}
+
+    @EventHandler (priority = EventPriority.MONITOR)
+    public void onPlayerQuit(PlayerQuitEvent ev)
+    {{
+        unloading.add(ev.getPlayer().getUniqueId());
+    }}
+
+    private void open()
+    {{
+        folder = new File(plugin.getDataFolder(), "players");
+        if (!folder.isDirectory() && !folder.mkdirs())
+        {{
+            plugin.getLogger().severe("Cannot create the players data folder " + folder);
+        }}
+
+        task = Bukkit.getScheduler().runTaskTimer(plugin, new Runnable() {{
+            @Override
+            public void run()
+            {{
+                flush(false);
+            }}
+        }}, FLUSH_INTERVAL_TICKS, FLUSH_INTERVAL_TICKS);
+    }}
+
+    private void close()
+    {{
+        if (task != null) task.cancel();
+
+        // Asynchronous tasks cannot be scheduled anymore when the plugin is disabled.
+        flush(true);
+
+        // Snapshots of the last periodic flush may still be waiting in the scheduler, which cancels them right
+        // after the plugin is disabled. Those already written, or replaced by newer ones, are skipped.
+        writeAll(new HashMap<>(pending));
+    }}
+
+    /**
+     * Snapshots the modified records on the main thread (YamlConfiguration is not thread-safe), then writes them.
+     *
+     * @param synchronous {{@code true}} to write them on the current thread.
+     */
+    private void flush(boolean synchronous)
+    {{
+        final Map<UUID, String> snapshot = new HashMap<>();
+
+        for (UUID id : dirty)
+        {{
+            dirty.remove(id);
+
+            final YamlConfiguration data = loaded.get(id);
+            if (data != null)
+            {{
+                final String content = data.saveToString();
+                snapshot.put(id, content);
+                pending.put(id, content);
+            }}
+        }}
+
+        for (UUID id : unloading)
+        {{
+            unloading.remove(id);
+            if (Bukkit.getPlayer(id) == null) loaded.remove(id);
+        }}
+
+        if (snapshot.isEmpty()) return;
+
+        final Runnable write = new Runnable() {{
+            @Override
+            public void run()
+            {{
+                writeAll(snapshot);
+            }}
+        }};
+
+        if (synchronous) write.run();
+        else Bukkit.getScheduler().runTaskAsynchronously(plugin, write);
+    }}
+
+    private void writeAll(Map<UUID, String> snapshot)
+    {{
+        synchronized (writeLock)
+        {{
+            for (Map.Entry<UUID, String> record : snapshot.entrySet())
+            {{
+                // Replaced by a newer snapshot (compared by identity), which writes it: writing this one could
+                // overwrite it, if that newer snapshot was written first.
+                if (pending.get(record.getKey()) != record.getValue()) continue;
+
+                try
+                {{
+                    write(record.getKey(), record.getValue());
+                }}
+                catch (IOException e)
+                {{
+                    plugin.getLogger().log(Level.SEVERE, "Cannot save the data of the player " + record.getKey(), e);
+                }}
+                finally
+                {{
+                    pending.remove(record.getKey(), record.getValue());
+                }}
+            }}
+        }}
+    }}
+
+    private void write(UUID id, String content) throws IOException
+    {{
+        final File target = file(id);
+        final File temporary = new File(folder, id + ".yml.tmp");
+
+        try (Writer writer = new OutputStreamWriter(new FileOutputStream(temporary), StandardCharsets.UTF_8))
+        {{
+            writer.write(content);
+        }}
+
+        try
+        {{
+            Files.move(temporary.toPath(), target.toPath(),
+                    StandardCopyOption.REPLACE_EXISTING, StandardCopyOption.ATOMIC_MOVE);
+        }}
+        catch (AtomicMoveNotSupportedException e)
+        {{
+            Files.move(temporary.toPath(), target.toPath(), StandardCopyOption.REPLACE_EXISTING);
+        }}
+    }}
+
+    private YamlConfiguration read(UUID id)
+    {{
+        final YamlConfiguration data = new YamlConfiguration();
+
+        try
+        {{
+            final String pendingContent = pending.get(id);
+            if (pendingContent != null)
+            {{
+                data.loadFromString(pendingContent);
+            }}
+            else
+            {{
+                final File file = file(id);
+                if (file.exists()) data.load(file);
+            }}
+        }}
+        catch (IOException | InvalidConfigurationException e)
+        {{
+            plugin.getLogger().log(Level.SEVERE, "Cannot load the data of the player " + id, e);
+        }}
+
+        return data;
+    }}
+
+    private File file(UUID id)
+    {{
+        return new File(folder, id + ".yml");
+    }}
+}}
+'''
+
+    PERSISTENCE_ZLIB_LIFECYCLE_TEMPLATE = '''
+    @Override
+    protected void onEnable()
+    {{
+        instance = this;
+        plugin = ZLib.getPlugin();
+        open();
+    }}
+
+    @Override
+    protected void onDisable()
+    {{
+        close();
+    }}'''
+
+    PERSISTENCE_BUKKIT_LIFECYCLE_TEMPLATE = '''
+    private {class_name}() {{}}
+
+    /**
+     * Starts the store. Call it when the plugin is enabled.
+     *
+     * @param plugin The plugin owning the data.
+     */
+    public static void start(Plugin plugin)
+    {{
+        instance = new {class_name}();
+        instance.plugin = plugin;
+        instance.open();
+
+        Bukkit.getPluginManager().registerEvents(instance, plugin);
+    }}
+
+    /**
+     * Saves all modified records and stops the store. Call it when the plugin is disabled.
+     */
+    public static void stop()
+    {{
+        instance.close();
+    }}'''
+
+    SENDER_PARAM = Param('sender', TypeRef('CommandSender'))
+    LABEL_PARAM = Param('label', TypeRef('String'))
+    ARGS_PARAM = Param('args', TypeRef('String[]'))
+    BUKKIT_COMMAND_PARAMS = [SENDER_PARAM, Param('cmd', TypeRef('Command')), LABEL_PARAM, ARGS_PARAM]
+    COMPLETIONS_TYPE = TypeRef('List', (TypeRef('String'),))
+    RETURN_TRUE = Return(Literal(True))
+    RETURN_NULL = Return(Literal(None))
+    ZLIB_COMMAND_IMPORTS = ['fr.zcraft.zlib.components.commands.Command',
+                            'fr.zcraft.zlib.components.commands.CommandException',
+                            'fr.zcraft.zlib.components.commands.CommandInfo']
+
+    LISTENER_TIMING_COMMENT = '''
+Time the handlers to see them in /{admin_command} timings:
+
+@EventHandler
+public void onEvent(SomeEvent ev)
+{{
+    final long timing = Timings.start();
+    try
+    {{
+        // ...
+    }}
+    finally
+    {{
+        Timings.stop("listener.{class_name}.onEvent", timing);
+    }}
+}}'''
+
+    COMMAND_BUKKIT_DISPATCHER_TEMPLATE = '''package {package};
+
+import org.bukkit.ChatColor;
+import org.bukkit.command.Command;
+import org.bukkit.command.CommandExecutor;
+import org.bukkit.command.CommandSender;
+import org.bukkit.command.TabCompleter;
+{imports}
+import java.util.Arrays;
+import java.util.Collections;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+
+
+/**
+ * Dispatches /{command_name} to its sub-commands, with a single hash lookup, and completes the sub-commands names
+ * from a prefix tree, so both stay fast whatever the number of sub-commands.
+ */
+public class {class_name} implements CommandExecutor, TabCompleter
+{{
+    private final Map<String, SubCommand> subCommands = new HashMap<>();
+    private final PrefixTrie names = new PrefixTrie();
+    private final String usage;
+
+    public {class_name}()
+    {{
+{registrations}
+        final StringBuilder usage = new StringBuilder();
+        for (String name : names.complete(""))
+            usage.append(usage.length() == 0 ? "" : "|").append(name);
+
+        this.usage = usage.toString();
+    }}
+
+    private void register(String name, SubCommand subCommand)
+    {{
+        subCommands.put(name.toLowerCase(), subCommand);
+        names.add(name);
+    }}
+
+    @Override
+    public boolean onCommand(CommandSender sender, Command cmd, String label, String[] args)
+    {{
+        final SubCommand subCommand = args.length > 0 ? subCommands.get(args[0].toLowerCase()) : null;
+
+        if (subCommand == null)
+        {{
+            sender.sendMessage(ChatColor.RED + "Usage: /" + label + " <" + usage + ">");
+            return true;
+        }}
+
+        return subCommand.execute(sender, label, Arrays.copyOfRange(args, 1, args.length));
+    }}
+
+    @Override
+    public List<String> onTabComplete(CommandSender sender, Command cmd, String label, String[] args)
+    {{
+        if (args.length <= 1)
+            return names.complete(args.length == 0 ? "" : args[0]);
+
+        final SubCommand subCommand = subCommands.get(args[0].toLowerCase());
+        if (subCommand == null)
+            return Collections.emptyList();
+
+        return subCommand.complete(sender, Arrays.copyOfRange(args, 1, args.length));
+    }}
+}}
+'''
+
+    SUB_COMMAND_INTERFACE_TEMPLATE = '''package {package};
+
+import org.bukkit.command.CommandSender;
+
+import java.util.List;
+
+
+public interface {class_name}
+{{
+    /**
+     * @param sender The command sender.
+     * @param label The alias of the main command used.
+     * @param args The arguments, without the sub-command name.
+     * @return {{@code false}} to display the command usage.
+     */
+    boolean execute(CommandSender sender, String label, String[] args);
+
+    /**
+     * @param sender The command sender.
+     * @param args The arguments, without the sub-command name.
+     * @return The auto-completion suggestions for the last argument, or {{@code null}} for the players names.
+     */
+    List<String> complete(CommandSender sender, String[] args);
+}}
+'''
+
+    PREFIX_TRIE_TEMPLATE = '''package {package};
+
+import java.util.ArrayList;
+import java.util.Collections;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+
+
+/**
+ * Case-insensitive prefix tree of names. Each node keeps the names below it, so completing a prefix costs its length
+ * plus the size of the result, whatever the number of names.
+ */
+public final class {class_name}
+{{
+    private final Node root = new Node();
+
+    public void add(String name)
+    {{
+        Node node = root;
+        node.names.add(name);
+
+        for (char c : name.toLowerCase().toCharArray())
+        {{
+            Node child = node.children.get(c);
+            if (child == null)
+            {{
+                child = new Node();
+                node.children.put(c, child);
+            }}
+
+            node = child;
+            node.names.add(name);
+        }}
+    }}
+
+    /**
+     * @param prefix A prefix.
+     * @return The names starting with this prefix (ignoring case), in insertion order.
+     */
+    public List<String> complete(String prefix)
+    {{
+        Node node = root;
+
+        for (char c : prefix.toLowerCase().toCharArray())
+        {{
+            node = node.children.get(c);
+            if (node == null) return Collections.emptyList();
+        }}
+
+        return new ArrayList<>(node.names);
+    }}
+
+    private static final class Node
+    {{
+        private final Map<Character, Node> children = new HashMap<>();
+        private final List<String> names = new ArrayList<>();
+    }}
+}}
+'''
+
+    TIMINGS_TEMPLATE = '''package {package};
+
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Map;
+import java.util.TreeMap;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ConcurrentMap;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.concurrent.atomic.AtomicLongArray;
+
+
+/**
+ * Low-overhead execution times registry.
+ *
+ * Wrap the code to measure with {{@link #start()}} and {{@link #stop(String, long)}}. When disabled (see the
+ * {{@code instrumentation}} option in config.yml), {{@link #start()}} returns 0 without reading the clock, and
+ * {{@link #stop(String, long)}} returns immediately.
+ *
+ * Times are recorded in log-linear histograms (4 buckets per power of two, so percentiles are accurate within 25%),
+ * updated without locks.
+ */
+public final class {class_name}
+{{
+    private static volatile boolean enabled = false;
+    private static final ConcurrentMap<String, Histogram> histograms = new ConcurrentHashMap<>();
+
+    private {class_name}() {{}}
+
+    public static void setEnabled(boolean enabled)
+    {{
+        {class_name}.enabled = enabled;
+    }}
+
+    public static boolean isEnabled()
+    {{
+        return enabled;
+    }}
+
+    /**
+     * @return The start time to pass to {{@link #stop(String, long)}}, or 0 if the instrumentation is disabled.
+     */
+    public static long start()
+    {{
+        return enabled ? System.nanoTime() : 0L;
+    }}
+
+    /**
+     * Records the time elapsed since the start time.
+     *
+     * @param name The name of the measured code.
+     * @param start The value returned by {{@link #start()}}.
+     */
+    public static void stop(String name, long start)
+    {{
+        if (start == 0L) return;
+        record(name, System.nanoTime() - start);
+    }}
+
+    /**
+     * @param name The name of the measured code.
+     * @param nanos An execution time, in nanoseconds.
+     */
+    public static void record(String name, long nanos)
+    {{
+        Histogram histogram = histograms.get(name);
+        if (histogram == null)
+        {{
+            final Histogram created = new Histogram();
+            histogram = histograms.putIfAbsent(name, created);
+            if (histogram == null) histogram = created;
+        }}
+
+        histogram.record(nanos);
+    }}
+
+    /**
+     * @return A line per measured code, sorted by name, with its count, p50, p99 and max times.
+     */
+    public static List<String> report()
+    {{
+        final List<String> lines = new ArrayList<>();
+
+        for (Map.Entry<String, Histogram> entry : new TreeMap<>(histograms).entrySet())
+        {{
+            final Histogram histogram = entry.getValue();
+            lines.add(String.format("%s: %d calls, p50 %.3f ms, p99 %.3f ms, max %.3f ms",
+                    entry.getKey(), histogram.count.get(),
+                    histogram.percentile(0.5) / 1e6, histogram.percentile(0.99) / 1e6, histogram.max.get() / 1e6));
+        }}
+
+        return lines;
+    }}
+
+    public static void reset()
+    {{
+        histograms.clear();
+    }}
+
+    private static final class Histogram
+    {{
+        private final AtomicLongArray buckets = new AtomicLongArray(256);
+        private final AtomicLong count = new AtomicLong();
+        private final AtomicLong max = new AtomicLong();
+
+        void record(long nanos)
+        {{
+            if (nanos < 0) nanos = 0;
+
+            buckets.incrementAndGet(bucket(nanos));
+            count.incrementAndGet();
+
+            long current;
+            while (nanos > (current = max.get()) && !max.compareAndSet(current, nanos));
+        }}
+
+        /**
+         * @return The upper bound of the bucket containing the given percentile, in nanoseconds.
+         */
+        long percentile(double percentile)
+        {{
+            final long total = count.get();
+            if (total == 0) return 0;
+
+            final long rank = (long) Math.ceil(percentile * total);
+            long seen = 0;
+
+            for (int bucket = 0; bucket < buckets.length(); bucket++)
+            {{
+                seen += buckets.get(bucket);
+                if (seen >= rank) return Math.min(upperBound(bucket), max.get());
+            }}
+
+            return max.get();
+        }}
+
+        private static int bucket(long nanos)
+        {{
+            if (nanos < 4) return (int) nanos;
+
+            final int exponent = 63 - Long.numberOfLeadingZeros(nanos);
+            return (exponent - 1) * 4 + (int) ((nanos >>> (exponent - 2)) & 3);
+        }}
+
+        private static long upperBound(int bucket)
+        {{
+            if (bucket < 4) return bucket;
+
+            final int exponent = bucket / 4 + 1;
+            return ((4L + bucket % 4 + 1) << (exponent - 2)) - 1;
+        }}
+    }}
+}}
+'''
+
+    TIMINGS_COMMAND_ZLIB_TEMPLATE = '''package {package};
+
+import fr.zcraft.zlib.components.commands.Command;
+import fr.zcraft.zlib.components.commands.CommandException;
+import fr.zcraft.zlib.components.commands.CommandInfo;
+import org.bukkit.command.CommandSender;
+import {timings_class};
+
+import java.util.Collections;
+import java.util.List;
+
+
+@CommandInfo (name = "{sub_command_name}", usageParameters = "[reset]")
+public final class {class_name} extends Command
+{{
+    @Override
+    protected void run() throws CommandException
+    {{
+        if (args.length > 0 && args[0].equalsIgnoreCase("reset"))
+        {{
+            Timings.reset();
+            success("Timings reset.");
+            return;
+        }}
+
+        if (!Timings.isEnabled())
+            warning("Instrumentation is disabled: set instrumentation to true in config.yml to record timings.");
+
+        for (String line : Timings.report())
+            info(line);
+    }}
+
+    @Override
+    protected List<String> complete() throws CommandException
     {{
-        // TODO implement auto-completion for /{command_name}
+        if (args.length == 1 && "reset".startsWith(args[0].toLowerCase()))
+            return Collections.singletonList("reset");
+
         return null;
     }}
+
+    @Override
+    public boolean canExecute(CommandSender sender)
+    {{
+        return sender.hasPermission("{permission}");
+    }}
 }}
+'''
+
+    TIMINGS_COMMAND_BUKKIT_TEMPLATE = '''package {package};
+
+import org.bukkit.ChatColor;
+import org.bukkit.command.CommandSender;
+import {commands_package}.SubCommand;
+import {timings_class};
+
+import java.util.Collections;
+import java.util.List;
+
+
+public final class {class_name} implements SubCommand
+{{
+    @Override
+    public boolean execute(CommandSender sender, String label, String[] args)
+    {{
+        if (!sender.hasPermission("{permission}"))
+        {{
+            sender.sendMessage(ChatColor.RED + "You are not allowed to do that.");
+            return true;
+        }}
+
+        if (args.length > 0 && args[0].equalsIgnoreCase("reset"))
+        {{
+            Timings.reset();
+            sender.sendMessage(ChatColor.GREEN + "Timings reset.");
+            return true;
+        }}
+
+        if (!Timings.isEnabled())
+            sender.sendMessage(ChatColor.GOLD + "Instrumentation is disabled: set instrumentation to true in "
+                    + "config.yml to record timings.");
+
+        for (String line : Timings.report())
+            sender.sendMessage(line);
+
+        return true;
+    }}
+
+    @Override
+    public List<String> complete(CommandSender sender, String[] args)
+    {{
+        if (args.length == 1 && "reset".startsWith(args[0].toLowerCase()))
+            return Collections.singletonList("reset");
+
+        return Collections.emptyList();
+    }}
+}}
+'''
+
+    CONFIG_TEMPLATE = '''# Records the execution times of commands and listeners, displayed by /{admin_command} timings.
+instrumentation: false
 '''
 
     def __init__(self, folder: Path, name: str, package: str, main_class: str, version: str, author: str = None,
                  website: str = None, description: str = None, load_at_startup: bool = False, zlib: bool = True,
-                 java_version: str = '1.7', gitignore: bool = True, stdout=None, stderr=None):
+                 java_version: str = '1.7', gitignore: bool = True, stdout=None, stderr=None,
+                 content_store: ContentStore = None, build_system: str = 'maven', task_scheduler: bool = False,
+                 persistence: bool = False, instrumentation: bool = False, admin_command: str = None,
+                 fast_dev_build: bool = False):
         self.folder = folder
 
         self.name = name
@@ -384,6 +2085,12 @@ public class {class_name} implements CommandExecutor, TabCompleter
         self.zlib = zlib
 
         self.java_version = java_version
+        self.build_system = build_system
+        self.fast_dev_build = fast_dev_build
+        self.task_scheduler = task_scheduler
+        self.persistence = persistence
+        self.instrumentation = instrumentation
+        self.admin_command = admin_command if admin_command is not None else re.sub('[^a-z0-9]', '', name.lower())
 
         self.gitignore = gitignore
 
@@ -393,6 +2100,18 @@ public class {class_name} implements CommandExecutor, TabCompleter
         self.stdout = stdout
         self.stderr = stderr
 
+        self.content_store = content_store
+
+        self.hooks = []
+        self.timings = {'validate': 0.0, 'render': 0.0, 'write': 0.0}
+
+        self._renderer = JavaRenderer()
+        self._model = None  # (path, relative name, SourceFile or content) of each file, see render()
+        self._model_options = None
+
+        self._files_written = 0
+        self._bytes_written = 0
+
         self._folder_main = self.folder / 'src/main'
         self._folder_java = self._folder_main / 'java'
         self._folder_resources = self._folder_main / 'resources'
@@ -400,62 +2119,413 @@ public class {class_name} implements CommandExecutor, TabCompleter
         self._folder_root_package = self._folder_java / (self.package.replace('.', '/'))
         self._folder_commands = self._folder_root_package / 'commands'
         self._folder_listeners = self._folder_root_package / 'listeners'
+        self._folder_tasks = self._folder_root_package / 'tasks'
+        self._folder_data = self._folder_root_package / 'data'
+        self._folder_metrics = self._folder_root_package / 'metrics'
 
     def add_command(self, command):
         self.commands.append(command)
+        self._model = None
 
     def add_listener(self, listener: str):
         self.listeners.append(listener)
+        self._model = None
+
+    def all_commands(self):
+        """
+        The added commands, plus the generated ones: with instrumentation, the `timings` administration sub-command,
+        added to the administration command (created if it was not added).
+        """
+        if not self.instrumentation:
+            return self.commands
+
+        commands = []
+        admin_command = None
+
+        for command in self.commands:
+            if command['name'] == self.admin_command:
+                admin_command = dict(command, sub_commands=command['sub_commands'] + [self.TIMINGS_SUB_COMMAND])
+                command = admin_command
+            commands.append(command)
+
+        if admin_command is None:
+            commands.append({
+                'name': self.admin_command,
+                'description': 'Administration of {0}'.format(self.name),
+                'sub_commands': [self.TIMINGS_SUB_COMMAND]
+            })
+
+        return commands
+
+    def add_hook(self, hook):
+        """
+        Registers a hook called with every generation event, as a dict with at least the `event` name and its
+        `time` (UNIX timestamp). Events are:
+
+        - generation_start (folder);
+        - render_start (file) and render_end (file, bytes, duration);
+        - file_written (path, bytes, duration, and method: 'write', or the ContentStore.materialize one);
+        - error (message, and path if related to a file);
+        - generation_end (files, bytes, duration, and phases: the total duration of each of the validate, render
+          and write phases).
+
+        Durations are in seconds.
+        """
+        self.hooks.append(hook)
+
+    def validate(self):
+        """
+        Checks the whole model before anything is written: every generated class name, file path and plugin.yml
+        key is indexed once, and invalid Java identifiers or collisions are reported together.
+
+        :raise ModelValidationError: if the model cannot be generated.
+        """
+        problems = []
+
+        classes = {}   # fully-qualified class name -> origin
+        imported = {}  # simple class names visible in the main class -> origin
+        files = {}     # case-folded file path -> origin (case-insensitive file systems)
+        yml_keys = {}  # case-folded plugin.yml command name -> origin (Bukkit lower-cases commands)
+
+        def check_identifier(identifier, origin):
+            if not StringUtils.is_java_identifier(identifier):
+                problems.append('{0}: "{1}" is not a valid Java identifier'.format(origin, identifier))
+
+        def index(table, key, origin, what):
+            if key in table:
+                problems.append('{0}: {1} collides with {2}'.format(origin, what, table[key]))
+                return False
+
+            table[key] = origin
+            return True
+
+        def index_class(package, class_name, file_path, origin, imported_in_main=True):
+            # A single collision is reported per class, as the other indexes would only repeat it.
+            check_identifier(class_name, origin)
+            index(classes, package + '.' + class_name, origin, 'class {0}.{1}'.format(package, class_name)) \
+                and index(files, str(file_path).casefold(), origin, 'file {0}'.format(file_path)) \
+                and (not imported_in_main
+                     or index(imported, class_name, origin, 'class name {0} in the main class'.format(class_name)))
+
+        for segment in self.package.split('.'):
+            check_identifier(segment, 'package {0}'.format(self.package))
+
+        for framework_class in (['ZPlugin', 'Commands'] if self.zlib else ['JavaPlugin']):
+            imported[framework_class] = 'the imported class {0}'.format(framework_class)
+
+        if self.gitignore:
+            index(files, str(self.folder / '.gitignore').casefold(), '.gitignore', 'file .gitignore')
+
+        if self.build_system not in self.BUILD_SYSTEMS:
+            problems.append('unknown build system "{0}" (expected one of: {1})'.format(
+                    self.build_system, ', '.join(self.BUILD_SYSTEMS)))
+
+        if self.build_system == 'gradle':
+            build_files = self.GRADLE_FILES
+        else:
+            build_files = ['pom.xml'] + (['.mvn/maven.config', '.mvn/jvm.config'] if self.fast_dev_build else [])
+
+        for build_file in build_files:
+            index(files, str(self.folder / build_file).casefold(), build_file, 'file ' + build_file)
+        index(files, str(self._folder_resources / 'plugin.yml').casefold(), 'plugin.yml', 'file plugin.yml')
+
+        index_class(self.package, self.main_class, self._folder_root_package / (self.main_class + '.java'),
+                    'main class {0}'.format(self.main_class))
+
+        if self.task_scheduler:
+            index_class(self.package + '.tasks', self.TICK_SCHEDULER_CLASS,
+                        self._folder_tasks / (self.TICK_SCHEDULER_CLASS + '.java'), 'the tick scheduler')
+
+        if self.persistence:
+            index_class(self.package + '.data', self.PERSISTENCE_CLASS,
+                        self._folder_data / (self.PERSISTENCE_CLASS + '.java'), 'the players data store')
+
+        for listener in self.listeners:
+            index_class(self.package + '.listeners', listener, self._folder_listeners / (listener + '.java'),
+                        'listener {0}'.format(listener))
+
+        if self.instrumentation:
+            index(files, str(self._folder_resources / 'config.yml').casefold(), 'config.yml', 'file config.yml')
+            index_class(self.package + '.metrics', self.TIMINGS_CLASS,
+                        self._folder_metrics / (self.TIMINGS_CLASS + '.java'), 'the timings registry')
+
+        commands = self.all_commands()
+
+        if not self.zlib and any(command['sub_commands'] for command in commands):
+            for support_class in (self.SUB_COMMAND_INTERFACE, self.PREFIX_TRIE_CLASS):
+                index_class(self.package + '.commands', support_class,
+                            self._folder_commands / (support_class + '.java'),
+                            'the sub-commands support class ' + support_class, imported_in_main=False)
+
+        for command in commands:
+            command_name = command['name']
+            origin = 'command /{0}'.format(command_name)
+
+            if not command_name or any(c.isspace() or c == ':' for c in command_name):
+                problems.append('{0}: "{1}" is not a valid plugin.yml command name'.format(origin, command_name))
+            index(yml_keys, command_name.casefold(), origin, 'plugin.yml command key {0}'.format(command_name))
+
+            if not self.zlib:
+                class_name = self.__generate_bukkit_command_class_name(command_name)
+                index_class(self.package + '.commands', class_name, self._folder_commands / (class_name + '.java'),
+                            origin)
+
+            if command['sub_commands']:
+                command_package = command_name.lower()
+                check_identifier(command_package, origin + ' (package)')
+
+                sub_command_names = {}
+                for sub_command in command['sub_commands']:
+                    sub_origin = '{0} {1}'.format(origin, sub_command)
+                    if not sub_command or any(c.isspace() for c in sub_command):
+                        problems.append('{0}: "{1}" is not a valid sub-command name'.format(sub_origin, sub_command))
+                    # The class would collide too: reported once, as a sub-command.
+                    if not index(sub_command_names, sub_command.lower(), sub_origin, 'sub-command ' + sub_command):
+                        continue
+
+                    class_name = self.__generate_sub_command_class_name(command_name, sub_command)
+                    index_class(self.package + '.commands.' + command_package, class_name,
+                                self._folder_commands / command_package / (class_name + '.java'), sub_origin,
+                                imported_in_main=self.zlib)
+
+        if problems:
+            raise ModelValidationError(problems)
 
     def generate(self):
+        self.timings = {'validate': 0.0, 'render': 0.0, 'write': 0.0}
+        self._files_written = 0
+        self._bytes_written = 0
+
+        start = time.perf_counter()
+        self._emit('generation_start', folder=str(self.folder))
+
+        try:
+            self.validate()
+            self.timings['validate'] = time.perf_counter() - start
+
+            self.commit(self.render())
+
+        except Exception as e:
+            self._emit('error', message=str(e))
+            raise
+
+        finally:
+            self._emit('generation_end', files=self._files_written, bytes=self._bytes_written,
+                       duration=time.perf_counter() - start, phases=dict(self.timings))
+
+    def render(self):
+        """
+        Renders the whole plugin in memory, without validating the model (see validate()) nor writing anything.
+
+        The model, i.e. the files to generate with their sources, is built once and kept until a command or a listener
+        is added or an option changed. The main class, listeners and commands stubs are intermediate representation
+        rendered by a JavaRenderer; the support classes (scheduler, data store, timings, sub-commands dispatchers...)
+        and the build files come from templates, and are kept as is.
+
+        :return: the list of GeneratedFile to commit.
+        """
+        # The model and the rendered files are a lot of small objects, none of them in a reference cycle: collecting
+        # garbage while they are created cannot free anything, but goes through all of them again and again.
+        collecting = gc.isenabled()
+        gc.disable()
+
+        try:
+            start = time.perf_counter()
+
+            options = tuple(getattr(self, option) for option in self.OPTIONS)
+            if self._model is None or self._model_options != options:
+                self._model = self._build_model()
+                self._model_options = options
+
+            if not self.hooks:
+                render = self._renderer.render
+                files = [GeneratedFile(path, render(source) if isinstance(source, SourceFile) else source)
+                         for path, _, source in self._model]
+
+                self.timings['render'] += time.perf_counter() - start
+                return files
+
+            self.timings['render'] += time.perf_counter() - start
+
+            files = []
+            for path, relative_name, source in self._model:
+                self._emit('render_start', file=relative_name)
+                start = time.perf_counter()
+
+                content = self._renderer.render(source) if isinstance(source, SourceFile) else source
+
+                duration = time.perf_counter() - start
+                self.timings['render'] += duration
+                self._emit('render_end', file=relative_name, bytes=len(content.encode('utf-8')), duration=duration)
+
+                files.append(GeneratedFile(path, content))
+
+            return files
+
+        finally:
+            if collecting:
+                gc.enable()
+
+    def _build_model(self):
+        sources = []
+        commands = self.all_commands()
+
         if self.gitignore:
-            self._save_file('.gitignore', self.GITIGNORE_TEMPLATE)
+            self._add(sources, self.folder, '.gitignore', self._generate_gitignore)
+
+        if self.build_system == 'gradle':
+            build_files = [('settings.gradle.kts', self._generate_gradle_settings),
+                           ('build.gradle.kts', self._generate_gradle_build),
+                           ('gradle.properties', lambda: self.GRADLE_PROPERTIES_TEMPLATE)]
+        else:
+            build_files = [('pom.xml', self._generate_maven)]
+
+            if self.fast_dev_build:
+                build_files += [('.mvn/maven.config', lambda: self.MAVEN_CONFIG_TEMPLATE),
+                                ('.mvn/jvm.config', lambda: self.MAVEN_JVM_CONFIG_TEMPLATE)]
 
-        self._save_file('pom.xml', self._generate_maven())
-        self._save_file('plugin.yml', self._generate_plugin_yml(), self._folder_resources)
+        for build_file, render in build_files:
+            self._add(sources, self.folder, build_file, render)
 
-        self._save_file(self.main_class + '.java', self._generate_main_class(), self._folder_root_package)
+        self._add(sources, self._folder_resources, 'plugin.yml', self._generate_plugin_yml, commands)
 
-        self._generate_listeners()
-        self._generate_commands()
+        if self.instrumentation:
+            self._add(sources, self._folder_resources, 'config.yml', self._generate_config)
 
-    def _save_file(self, relative_name: str, content: str, root: Path = None):
-        if root is None:
-            root = self.folder
+        self._add(sources, self._folder_root_package, self.main_class + '.java', self._generate_main_class, commands)
+
+        if self.task_scheduler:
+            self._add(sources, self._folder_tasks, self.TICK_SCHEDULER_CLASS + '.java', self._generate_tick_scheduler)
+
+        if self.persistence:
+            self._add(sources, self._folder_data, self.PERSISTENCE_CLASS + '.java', self._generate_persistence)
+
+        if self.instrumentation:
+            self._add(sources, self._folder_metrics, self.TIMINGS_CLASS + '.java', self._generate_timings)
+
+        self._generate_listeners(sources)
+        self._generate_commands(sources, commands)
+
+        return sources
+
+    def commit(self, files: list):
+        """Writes the rendered files (see render())."""
+        for generated_file in files:
+            self._save_file(generated_file.path, generated_file.content)
+
+    def _emit(self, event: str, **data):
+        if not self.hooks:
+            return
+
+        data['event'] = event
+        data['time'] = time.time()
+
+        # Each hook gets its own copy, so one altering or keeping the event cannot affect the others
+        for hook in self.hooks:
+            hook(dict(data))
+
+    def _add(self, sources: list, root: Path, relative_name: str, build, *args, **kwargs):
+        sources.append((root / relative_name, relative_name, build(*args, **kwargs)))
+
+    def _save_file(self, file_path: Path, content: str):
+        start = time.perf_counter()
 
-        file_path = root / relative_name
         parent = file_path.parent
 
         if not parent.exists():
             file_path.parent.mkdir(parents=True)
         elif not parent.is_dir():
+            message = 'Cannot create folder {0}: a non-folder file already exists'.format(str(parent))
             if self.stderr:
-                self.stderr.write(
-                        Colors.FAIL + 'Cannot create folder {0}: a non-folder file already exists' + Colors.RESET)
+                self.stderr.write(Colors.FAIL + message + Colors.RESET + '\n')
+            self._emit('error', message=message, path=str(file_path))
             return
 
-        file_path.touch(exist_ok=True)
-        with file_path.open(mode='w') as f:
-            f.write(content)
+        if self.content_store:
+            encoded = content.encode('utf-8')
+            size = len(encoded)
+            method = self.content_store.materialize(encoded, file_path)
+        else:
+            with file_path.open(mode='w') as f:
+                f.write(content)
+
+            size = len(content.encode('utf-8'))
+            method = 'write'
+
+        duration = time.perf_counter() - start
+        self.timings['write'] += duration
+        self._files_written += 1
+        self._bytes_written += size
+
+        self._emit('file_written', path=str(file_path), bytes=size, duration=duration, method=method)
 
         if self.stdout:
             self.stdout.write('Wrote file {0}\n'.format(str(file_path)))
 
-    def _generate_maven(self):
+    def _generate_gitignore(self):
+        if self.build_system == 'gradle':
+            return self.GITIGNORE_TEMPLATE + self.GITIGNORE_GRADLE_TEMPLATE
+
+        return self.GITIGNORE_TEMPLATE
+
+    def _artifact_coordinates(self):
         artifact = StringUtils.create_java_class_name(self.name)
-        group = self.package.replace('.' + artifact, '')
+        return self.package.replace('.' + artifact, ''), artifact
+
+    def _generate_maven(self):
+        group, artifact = self._artifact_coordinates()
 
         return self.MAVEN_TEMPLATE.format(
                 groupId=group,
                 artifactId=artifact,
                 version=self.version,
                 java_version=self.java_version,
-                build=self.MAVEN_ZLIB_SHADING_TEMPLATE.format(pckg=self.package) if self.zlib else '',
+                build=self._generate_maven_build(),
                 zlib_repo=self.MAVEN_ZLIB_REPO_TEMPLATE if self.zlib else '',
                 zlib_dependency=self.MAVEN_ZLIB_DEPENDENCY_TEMPLATE if self.zlib else ''
         )
 
-    def _generate_plugin_yml(self):
+    def _generate_maven_build(self):
+        release_build = ''
+        if self.zlib:
+            release_build = self.MAVEN_ZLIB_SHADING_TEMPLATE.format(
+                    plugins=self.MAVEN_ZLIB_SHADE_PLUGIN_TEMPLATE.format(minimize_jar='true', pckg=self.package)
+            )
+
+        if not self.fast_dev_build:
+            return release_build
+
+        # Shading stays in the development build without minimization, as the plugin cannot run without zLib
+        return self.MAVEN_PROFILES_TEMPLATE.format(
+                release_profile=self.MAVEN_RELEASE_PROFILE_TEMPLATE.format(
+                        build=StringUtils.indent(release_build, 2).rstrip('\n')
+                ) if release_build else '',
+                dev_plugins='\n' + StringUtils.indent(
+                        self.MAVEN_ZLIB_SHADE_PLUGIN_TEMPLATE.format(minimize_jar='false', pckg=self.package), 2
+                ).rstrip('\n') if self.zlib else ''
+        )
+
+    def _generate_gradle_settings(self):
+        _, artifact = self._artifact_coordinates()
+        return self.GRADLE_SETTINGS_TEMPLATE.format(artifactId=artifact)
+
+    def _generate_gradle_build(self):
+        group, _ = self._artifact_coordinates()
+
+        return self.GRADLE_BUILD_TEMPLATE.format(
+                groupId=group,
+                version=self.version,
+                java_version=self.java_version,
+                zlib_plugin=self.GRADLE_ZLIB_PLUGIN_TEMPLATE if self.zlib else '',
+                build=self.GRADLE_ZLIB_SHADOW_TEMPLATE.format(pckg=self.package) if self.zlib else '',
+                zlib_repo=self.GRADLE_ZLIB_REPO_TEMPLATE if self.zlib else '',
+                zlib_dependency=self.GRADLE_ZLIB_DEPENDENCY_TEMPLATE if self.zlib else ''
+        )
+
+    def _generate_config(self):
+        return self.CONFIG_TEMPLATE.format(admin_command=self.admin_command)
+
+    def _generate_plugin_yml(self, commands):
         plugin_yml = '''name: {0}\nversion: {1}\nmain: {2}.{3}\n''' \
             .format(self.name, self.version, self.package, self.main_class)
 
@@ -471,16 +2541,17 @@ public class {class_name} implements CommandExecutor, TabCompleter
         if self.load_at_startup:
             plugin_yml += '\nload: STARTUP\n'
 
-        if self.commands:
+        if commands:
             plugin_yml += '\ncommands:\n'
-            for command in self.commands:
+            for command in commands:
                 plugin_yml += '    {0}:\n        description: {1}\n'.format(command['name'], command['description'])
 
         return plugin_yml
 
-    def _generate_main_class(self):
-        on_enable = ''
+    def _generate_main_class(self, commands):
         imports = []
+        on_enable = []  # groups of statements, separated by blank lines
+        on_disable = []
 
         if self.zlib:
             components = []
@@ -488,95 +2559,296 @@ public class {class_name} implements CommandExecutor, TabCompleter
             base_class = 'ZPlugin'
             imports.append('fr.zcraft.zlib.core.ZPlugin')
 
-            if self.commands:
-                components.append('Commands.class')
+            if self.task_scheduler:
+                components.append(self.TICK_SCHEDULER_CLASS)
+                imports.append(self.package + '.tasks.' + self.TICK_SCHEDULER_CLASS)
+
+            if self.persistence:
+                components.append(self.PERSISTENCE_CLASS)
+                imports.append(self.package + '.data.' + self.PERSISTENCE_CLASS)
+
+            if commands:
+                components.append('Commands')
                 imports.append('fr.zcraft.zlib.components.commands.Commands')
 
             for listener in self.listeners:
-                components.append(listener + '.class')
+                components.append(listener)
                 imports.append(self.package + '.listeners.' + listener)
 
-            on_enable = 'loadComponents(' + ', '.join(components) + ');\n'
+            on_enable.append([Call('loadComponents', [ClassLiteral(TypeRef(component)) for component in components])])
 
-            if self.commands:
-                on_enable += '\n'
-                for command in self.commands:
-                    sub_commands_classes = []
+            registrations = []
+            for command in commands:
+                sub_commands_classes = []
+                sub_commands_package = self.package + '.commands.' + command['name'].lower() + '.'
 
-                    for sub_command_name in command['sub_commands']:
-                        class_name = self.__generate_zlib_command_class_name(command['name'], sub_command_name)
-                        sub_commands_classes.append(class_name + '.class')
-                        imports.append(self.package + '.commands.' + command['name'].lower() + '.' + class_name)
+                for sub_command_name in command['sub_commands']:
+                    class_name = self.__generate_sub_command_class_name(command['name'], sub_command_name)
+                    sub_commands_classes.append(ClassLiteral(TypeRef(class_name)))
+                    imports.append(sub_commands_package + class_name)
 
-                    on_enable += 'Commands.register("{name}"{sub_commands});\n'.format(
-                            name=command['name'],
-                            sub_commands=', ' + ', '.join(sub_commands_classes) if command['sub_commands'] else ''
-                    )
+                registrations.append(Call('register', [Literal(command['name'])] + sub_commands_classes,
+                                          target=Name('Commands')))
+
+            on_enable.append(registrations)
         else:
             base_class = 'JavaPlugin'
             imports.append('org.bukkit.plugin.java.JavaPlugin')
 
+            components = []
+            if self.task_scheduler:
+                components.append(self.package + '.tasks.' + self.TICK_SCHEDULER_CLASS)
+            if self.persistence:
+                components.append(self.package + '.data.' + self.PERSISTENCE_CLASS)
+
+            for component in components:
+                imports.append(component)
+                on_enable.append([Call('start', [Name('this')], target=Name(component.rsplit('.', 1)[1]))])
+                on_disable.append(Call('stop', [], target=Name(component.rsplit('.', 1)[1])))
+
+            plugin_manager = Call('getPluginManager', [], target=Call('getServer', []))
+            registrations = []
             for listener in self.listeners:
                 imports.append(self.package + '.listeners.' + listener)
-                on_enable += 'getServer().getPluginManager().registerEvents(new {0}(), this);\n'.format(listener)
-
-            if self.commands:
-                on_enable += '\n'
-                for command in self.commands:
-                    class_name = self.__generate_bukkit_command_class_name(command['name'])
-                    imports.append(self.package + '.commands.' + class_name)
-                    on_enable += 'getCommand("{0}").setExecutor(new {1}());\n'.format(command['name'], class_name)
-
-        return self.MAIN_CLASS_TEMPLATE.format(
-                package=self.package,
-                class_name=self.main_class,
-                base_class=base_class,
-                imports='\n'.join('import {0};'.format(class_name) for class_name in imports),
-                on_enable='\n\n' + StringUtils.indent(on_enable.strip(), 2) if on_enable else ''
+                registrations.append(Call('registerEvents', [New(TypeRef(listener)), Name('this')],
+                                          target=plugin_manager))
+
+            on_enable.append(registrations)
+
+            executors = []
+            for command in commands:
+                class_name = self.__generate_bukkit_command_class_name(command['name'])
+                imports.append(self.package + '.commands.' + class_name)
+                executors.append(Call('setExecutor', [New(TypeRef(class_name))],
+                                      target=Call('getCommand', [Literal(command['name'])])))
+
+            on_enable.append(executors)
+
+        if self.instrumentation:
+            imports.append(self.package + '.metrics.' + self.TIMINGS_CLASS)
+            on_enable.insert(0, [
+                Call('saveDefaultConfig', []),
+                Call('setEnabled', [Call('getBoolean', [Literal('instrumentation'), Literal(False)],
+                                         target=Call('getConfig', []))], target=Name(self.TIMINGS_CLASS))
+            ])
+
+        on_enable_body = [Assign('instance', Name('this'))]
+        for group in on_enable:
+            if group:
+                on_enable_body += [BLANK] + group
+
+        members = [
+            FieldDecl('instance', TypeRef(self.main_class), None, static=True, visibility='private', final=False),
+            BLANK,
+            MethodDecl('onEnable', body=on_enable_body, override=True),
+            BLANK
+        ]
+
+        if on_disable:
+            members += [MethodDecl('onDisable', body=on_disable, override=True), BLANK]
+
+        members.append(MethodDecl('get', TypeRef(self.main_class), body=[Return(Name('instance'))], static=True))
+
+        return SourceFile(self.package, imports, classes=[ClassDecl(self.main_class, base_class, members, final=True)])
+
+    def _generate_tick_scheduler(self):
+        if self.zlib:
+            imports = 'import fr.zcraft.zlib.core.ZLib;\nimport fr.zcraft.zlib.core.ZLibComponent;\n'
+            lifecycle = self.TICK_SCHEDULER_ZLIB_LIFECYCLE_TEMPLATE
+        else:
+            imports = ''
+            lifecycle = self.TICK_SCHEDULER_BUKKIT_LIFECYCLE_TEMPLATE.format(class_name=self.TICK_SCHEDULER_CLASS)
+
+        return self.TICK_SCHEDULER_TEMPLATE.format(
+                package=self.package + '.tasks',
+                imports=imports,
+                class_name=self.TICK_SCHEDULER_CLASS,
+                extends='extends ZLibComponent ' if self.zlib else '',
+                lifecycle=lifecycle
         )
 
-    def _generate_listeners(self):
+    def _generate_persistence(self):
+        if self.zlib:
+            imports = 'import fr.zcraft.zlib.core.ZLib;\nimport fr.zcraft.zlib.core.ZLibComponent;\n'
+            lifecycle = self.PERSISTENCE_ZLIB_LIFECYCLE_TEMPLATE
+        else:
+            imports = ''
+            lifecycle = self.PERSISTENCE_BUKKIT_LIFECYCLE_TEMPLATE.format(class_name=self.PERSISTENCE_CLASS)
+
+        return self.PERSISTENCE_TEMPLATE.format(
+                package=self.package + '.data',
+                imports=imports,
+                class_name=self.PERSISTENCE_CLASS,
+                extends='extends ZLibComponent ' if self.zlib else '',
+                lifecycle=lifecycle
+        )
+
+    def _generate_listeners(self, sources: list):
         for listener in self.listeners:
-            self._save_file(listener + '.java', self._generate_listener(listener), self._folder_listeners)
+            self._add(sources, self._folder_listeners, listener + '.java', self._generate_listener, listener)
 
     def _generate_listener(self, listener):
-        return self.LISTENER_TEMPLATE.format(
-                package=self.package + '.listeners',
-                imports='import fr.zcraft.zlib.core.ZLibComponent;\n' if self.zlib else '',
-                class_name=listener,
-                extends='extends ZLibComponent ' if self.zlib else ''
+        comment = 'TODO implement events listeners'
+        if self.instrumentation:
+            comment += '\n' + self.LISTENER_TIMING_COMMENT.format(admin_command=self.admin_command, class_name=listener)
+
+        return SourceFile(
+                self.package + '.listeners',
+                ['org.bukkit.event.Listener'] + (['fr.zcraft.zlib.core.ZLibComponent'] if self.zlib else []),
+                classes=[ClassDecl(listener, 'ZLibComponent' if self.zlib else None, [Comment(comment)],
+                                   interfaces=['Listener'], final=True)]
         )
 
-    def _generate_commands(self):
-        for command in self.commands:
-            if self.zlib:
-                package_folder = self._folder_commands / command['name'].lower()
+    def _generate_timings(self):
+        return self.TIMINGS_TEMPLATE.format(package=self.package + '.metrics', class_name=self.TIMINGS_CLASS)
+
+    def _timed(self, body: list, timing_name: str):
+        """Wraps statements to record their execution time, if the instrumentation is enabled."""
+        if not self.instrumentation:
+            return body
 
+        return [
+            LocalVar('timing', TypeRef('long'), Call('start', [], target=Name(self.TIMINGS_CLASS))),
+            TryFinally(body, [Call('stop', [Literal(timing_name), Name('timing')], target=Name(self.TIMINGS_CLASS))])
+        ]
+
+    def _timings_imports(self):
+        return [self.package + '.metrics.' + self.TIMINGS_CLASS] if self.instrumentation else []
+
+    def _is_timings_command(self, command_name: str, sub_command_name: str):
+        return self.instrumentation and command_name == self.admin_command \
+            and sub_command_name == self.TIMINGS_SUB_COMMAND
+
+    def _generate_commands(self, sources: list, commands):
+        if not self.zlib and any(command['sub_commands'] for command in commands):
+            for support_class, template in ((self.SUB_COMMAND_INTERFACE, self.SUB_COMMAND_INTERFACE_TEMPLATE),
+                                            (self.PREFIX_TRIE_CLASS, self.PREFIX_TRIE_TEMPLATE)):
+                self._add(sources, self._folder_commands, support_class + '.java', template.format,
+                          package=self.package + '.commands', class_name=support_class)
+
+        for command in commands:
+            package_folder = self._folder_commands / command['name'].lower()
+
+            if self.zlib:
                 for sub_command in command['sub_commands']:
-                    self._save_file(self.__generate_zlib_command_class_name(command['name'], sub_command) + '.java',
-                                    self._generate_command_zlib(command['name'], sub_command), package_folder)
+                    self._add(sources, package_folder,
+                              self.__generate_sub_command_class_name(command['name'], sub_command) + '.java',
+                              self._generate_command_zlib, command['name'], sub_command)
 
             else:
-                self._save_file(self.__generate_bukkit_command_class_name(command['name']) + '.java',
-                                self._generate_command_bukkit(command['name']), self._folder_commands)
+                self._add(sources, self._folder_commands,
+                          self.__generate_bukkit_command_class_name(command['name']) + '.java',
+                          self._generate_command_bukkit, command)
+
+                for sub_command in command['sub_commands']:
+                    self._add(sources, package_folder,
+                              self.__generate_sub_command_class_name(command['name'], sub_command) + '.java',
+                              self._generate_sub_command_bukkit, command['name'], sub_command)
 
     def _generate_command_zlib(self, command_name, sub_command_name):
-        return self.COMMAND_ZLIB_TEMPLATE.format(
-            package=self.package + '.commands.' + command_name.lower(),
-            command_name=command_name,
-            sub_command_name=sub_command_name,
-            class_name=self.__generate_zlib_command_class_name(command_name, sub_command_name)
+        if self._is_timings_command(command_name, sub_command_name):
+            return self.TIMINGS_COMMAND_ZLIB_TEMPLATE.format(
+                package=self.package + '.commands.' + command_name.lower(),
+                sub_command_name=sub_command_name,
+                class_name=self.__generate_sub_command_class_name(command_name, sub_command_name),
+                timings_class=self.package + '.metrics.' + self.TIMINGS_CLASS,
+                permission=self.admin_command + '.' + self.TIMINGS_SUB_COMMAND
+            )
+
+        command = '/' + command_name + ' ' + sub_command_name
+
+        return SourceFile(
+                self.package + '.commands.' + command_name.lower(),
+                self.ZLIB_COMMAND_IMPORTS + self._timings_imports() + [BLANK, 'java.util.List'],
+                classes=[ClassDecl(
+                        self.__generate_sub_command_class_name(command_name, sub_command_name), 'Command', [
+                            MethodDecl('run', visibility='protected', override=True, throws=['CommandException'],
+                                       body=self._timed([Comment('TODO implement command ' + command)],
+                                                        'command.' + command)),
+                            BLANK,
+                            self._complete_stub('complete', [], command, visibility='protected',
+                                                throws=['CommandException'])
+                        ],
+                        annotations=[Annotation('CommandInfo', [('name', Literal(sub_command_name)),
+                                                                ('usageParameters', Literal(''))])],
+                        final=True
+                )]
+        )
+
+    def _generate_command_bukkit(self, command):
+        command_name = command['name']
+
+        if command['sub_commands']:
+            sub_commands_package = self.package + '.commands.' + command_name.lower()
+            registrations = ''
+            imports = ''
+
+            for sub_command in command['sub_commands']:
+                class_name = self.__generate_sub_command_class_name(command_name, sub_command)
+                imports += 'import {0}.{1};\n'.format(sub_commands_package, class_name)
+                registrations += 'register("{0}", new {1}());\n'.format(sub_command, class_name)
+
+            return self.COMMAND_BUKKIT_DISPATCHER_TEMPLATE.format(
+                package=self.package + '.commands',
+                imports=imports,
+                command_name=command_name,
+                class_name=self.__generate_bukkit_command_class_name(command_name),
+                registrations=StringUtils.indent(registrations, 2)
+            )
+
+        return SourceFile(
+                self.package + '.commands',
+                ['org.bukkit.command.Command', 'org.bukkit.command.CommandExecutor', 'org.bukkit.command.CommandSender',
+                 'org.bukkit.command.TabCompleter'] + self._timings_imports() + [BLANK, 'java.util.List'],
+                classes=[ClassDecl(
+                        self.__generate_bukkit_command_class_name(command_name), members=[
+                            self._execute_stub('onCommand', self.BUKKIT_COMMAND_PARAMS, '/' + command_name),
+                            BLANK,
+                            self._complete_stub('onTabComplete', self.BUKKIT_COMMAND_PARAMS, '/' + command_name)
+                        ],
+                        interfaces=['CommandExecutor', 'TabCompleter']
+                )]
         )
 
-    def _generate_command_bukkit(self, command_name):
-        return self.COMMAND_BUKKIT_TEMPLATE.format(
-            package=self.package + '.commands',
-            command_name=command_name,
-            class_name=self.__generate_bukkit_command_class_name(command_name)
+    def _generate_sub_command_bukkit(self, command_name, sub_command_name):
+        if self._is_timings_command(command_name, sub_command_name):
+            return self.TIMINGS_COMMAND_BUKKIT_TEMPLATE.format(
+                package=self.package + '.commands.' + command_name.lower(),
+                commands_package=self.package + '.commands',
+                class_name=self.__generate_sub_command_class_name(command_name, sub_command_name),
+                timings_class=self.package + '.metrics.' + self.TIMINGS_CLASS,
+                permission=self.admin_command + '.' + self.TIMINGS_SUB_COMMAND
+            )
+
+        return SourceFile(
+                self.package + '.commands.' + command_name.lower(),
+                ['org.bukkit.command.CommandSender', self.package + '.commands.' + self.SUB_COMMAND_INTERFACE]
+                + self._timings_imports() + [BLANK, 'java.util.List'],
+                classes=[ClassDecl(
+                        self.__generate_sub_command_class_name(command_name, sub_command_name), members=[
+                            self._execute_stub('execute', [self.SENDER_PARAM, self.LABEL_PARAM, self.ARGS_PARAM],
+                                               '/{0} {1}'.format(command_name, sub_command_name)),
+                            BLANK,
+                            self._complete_stub('complete', [self.SENDER_PARAM, self.ARGS_PARAM],
+                                                '/{0} {1}'.format(command_name, sub_command_name))
+                        ],
+                        interfaces=[self.SUB_COMMAND_INTERFACE],
+                        final=True
+                )]
         )
 
+    def _execute_stub(self, name: str, params: list, command: str):
+        return MethodDecl(name, TypeRef('boolean'), params, override=True,
+                          body=self._timed([Comment('TODO implement command ' + command), self.RETURN_TRUE],
+                                           'command.' + command))
+
+    def _complete_stub(self, name: str, params: list, command: str, **kwargs):
+        return MethodDecl(name, self.COMPLETIONS_TYPE, params,
+                          body=[Comment('TODO implement auto-completion for ' + command), self.RETURN_NULL],
+                          override=True, **kwargs)
+
     @staticmethod
-    def __generate_zlib_command_class_name(command_name: str, sub_command_name: str):
+    def __generate_sub_command_class_name(command_name: str, sub_command_name: str):
         return command_name.capitalize() + sub_command_name.capitalize() + 'Command'
 
     @staticmethod
@@ -613,6 +2885,27 @@ if __name__ == '__main__':
 
     zlib = I.ask_bool('Do you want to use zLib? The generated code will use it instead of old Bukkit methods.', True)
 
+    task_scheduler = I.ask_bool('Do you want a tick-budgeted task scheduler, to spread heavy work (like bulk block '
+                                'or entity operations) over several ticks?', False)
+
+    persistence = I.ask_bool('Do you want a players data store, loading data on join and saving it asynchronously '
+                             'and atomically?', False)
+
+    instrumentation = I.ask_bool('Do you want to record the commands and listeners execution times (displayed by an '
+                                 'administration command, and disabled by default in config.yml)?', False)
+
+    I.title('Build system')
+
+    build_system = None
+    while build_system not in BukkitPluginGenerator.BUILD_SYSTEMS:
+        build_system = I.ask('Do you want to build your plugin with Maven or Gradle (Kotlin DSL)? '
+                             '[maven/gradle]', 'maven').lower()
+
+    fast_dev_build = False
+    if build_system == 'maven':
+        fast_dev_build = I.ask_bool('Do you want a fast development Maven profile (mvn package -Pdev), with '
+                                    'incremental compilation, no jar minimization and parallel builds?', False)
+
     I.title('Git')
 
     gitignore = I.ask_bool('Do you want us to generate a .gitignore file?', True)
@@ -644,11 +2937,10 @@ if __name__ == '__main__':
             command_description = I.ask('Enter a short description, if you want.', '')
 
             sub_commands = []
-            if zlib:
-                sub_commands_raw = I.ask('Enter the name of the /{0} sub-commands, '
-                                         'space-separated.'.format(command_name), '').split()
-                for sub_command in sub_commands_raw:
-                    sub_commands.append(sub_command.strip())
+            sub_commands_raw = I.ask('Enter the name of the /{0} sub-commands, '
+                                     'space-separated.'.format(command_name), '').split()
+            for sub_command in sub_commands_raw:
+                sub_commands.append(sub_command.strip())
 
             commands.append({
                 'name': command_name,
@@ -675,12 +2967,18 @@ if __name__ == '__main__':
             folder=folder_full,
             name=name, package=package, main_class=main_class, version=version,
             author=author, website=website, description=description, load_at_startup=load_at_startup, zlib=zlib,
-            java_version=java_version, stdout=sys.stdout, stderr=sys.stderr
+            java_version=java_version, build_system=build_system, task_scheduler=task_scheduler,
+            persistence=persistence, instrumentation=instrumentation, fast_dev_build=fast_dev_build,
+            stdout=sys.stdout, stderr=sys.stderr
     )
 
     [generator.add_listener(listener) for listener in listeners]
     [generator.add_command(command) for command in commands]
 
-    generator.generate()
+    try:
+        generator.generate()
+    except ModelValidationError as e:
+        print(Colors.FAIL + str(e) + Colors.RESET, file=sys.stderr)
+        sys.exit(1)
 
     print(Colors.BOLD + '\nDone.' + Colors.RESET)